@@ -0,0 +1,151 @@
+"""
+Long-lived OpenAI and Gemini clients shared across requests.
+
+Building a client per call costs SDK setup and a fresh TLS handshake on every
+chat or itinerary request.  ``ai_clients`` keeps one client per API key
+instead: OpenAI clients share a bounded keep-alive ``httpx`` pool
+(``AI_POOL_CONNECTIONS`` / ``AI_POOL_KEEPALIVE``) and are safe to use from
+several threads at once.  Clients for the server's own keys are kept for the
+life of the process; clients for keys users send with a request live in a
+small LRU (``AI_USER_CLIENTS`` entries, dropped after an hour idle) so a
+stream of one-off keys cannot grow memory without bound.  Callers hold a
+client for the length of a call (``with ai_clients.openai(key) as client``)
+so an evicted user-key client, and its keep-alive sockets, is closed as soon
+as its last in-flight request finishes; everything still held is closed at
+shutdown.
+
+``google.generativeai`` keeps its API key in process-wide configuration, so
+Gemini models are built for one key at a time: switching keys reconfigures
+the SDK and drops models bound to the old key.  Only ``GOOGLE_API_KEY``
+reaches Gemini today, so in practice it is configured once.
+
+The SDKs and ``httpx`` are imported on first use, not at start-up.
+"""
+
+import atexit
+import logging
+import os
+import threading
+from contextlib import contextmanager
+
+from result_cache import ResultCache
+
+AI_POOL_CONNECTIONS = int(os.getenv('AI_POOL_CONNECTIONS', 20))
+AI_POOL_KEEPALIVE = int(os.getenv('AI_POOL_KEEPALIVE', 10))
+AI_KEEPALIVE_SECONDS = float(os.getenv('AI_KEEPALIVE_SECONDS', 60))
+AI_TIMEOUT_SECONDS = float(os.getenv('AI_TIMEOUT_SECONDS', 30))
+AI_MAX_RETRIES = int(os.getenv('AI_MAX_RETRIES', 2))
+AI_USER_CLIENTS = int(os.getenv('AI_USER_CLIENTS', 16))
+
+logger = logging.getLogger(__name__)
+
+
+class _UserClient:
+    """A user-key client with its in-flight request count."""
+
+    def __init__(self, client):
+        self.client = client
+        self.in_flight = 0
+        self.evicted = False
+
+
+class AIClientRegistry:
+    """Thread-safe cache of provider clients keyed by API key."""
+
+    def __init__(self, user_clients=AI_USER_CLIENTS):
+        # Reentrant: the user LRU reports evictions from inside get/set.
+        self._lock = threading.RLock()
+        self._openai = {}
+        self._user_openai = ResultCache(max_entries=user_clients, ttl_seconds=3600, on_evict=self._evict)
+        self._gemini_key = None
+        self._gemini_models = {}
+        self.created = 0
+
+    def _new_openai(self, api_key):
+        import httpx
+        from openai import OpenAI
+
+        http_client = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=AI_POOL_CONNECTIONS,
+                max_keepalive_connections=AI_POOL_KEEPALIVE,
+                keepalive_expiry=AI_KEEPALIVE_SECONDS,
+            ),
+            timeout=httpx.Timeout(AI_TIMEOUT_SECONDS, connect=5.0),
+        )
+        self.created += 1
+        return OpenAI(api_key=api_key, http_client=http_client, max_retries=AI_MAX_RETRIES)
+
+    @contextmanager
+    def openai(self, api_key):
+        """Hold the shared OpenAI client for ``api_key`` for the length of a call."""
+        if api_key == os.getenv('OPENAI_API_KEY'):
+            client = self._openai.get(api_key)
+            if client is None:
+                with self._lock:
+                    client = self._openai.get(api_key)
+                    if client is None:
+                        client = self._openai[api_key] = self._new_openai(api_key)
+            yield client
+            return
+
+        with self._lock:
+            entry = self._user_openai.get(api_key)
+            if entry is None:
+                entry = _UserClient(self._new_openai(api_key))
+                self._user_openai.set(api_key, entry)
+            entry.in_flight += 1
+        try:
+            yield entry.client
+        finally:
+            with self._lock:
+                entry.in_flight -= 1
+                idle = entry.evicted and not entry.in_flight
+            if idle:
+                self._close(entry.client)
+
+    def _evict(self, entry):
+        with self._lock:
+            entry.evicted = True
+            idle = not entry.in_flight
+        if idle:
+            self._close(entry.client)
+
+    def gemini(self, api_key, model_name, system_instruction):
+        """A shared ``GenerativeModel`` for ``api_key`` and the given model settings."""
+        import google.generativeai as genai
+
+        key = (model_name, system_instruction)
+        with self._lock:
+            if api_key != self._gemini_key:
+                genai.configure(api_key=api_key)
+                self._gemini_key = api_key
+                self._gemini_models.clear()
+            model = self._gemini_models.get(key)
+            if model is None:
+                model = genai.GenerativeModel(model_name=model_name, system_instruction=system_instruction)
+                self._gemini_models[key] = model
+                self.created += 1
+            return model
+
+    def close(self):
+        """Close every pooled connection; clients are rebuilt on next use."""
+        with self._lock:
+            clients = list(self._openai.values()) + [entry.client for entry in self._user_openai.values()]
+            self._openai.clear()
+            self._user_openai.invalidate()
+            self._gemini_models.clear()
+            self._gemini_key = None
+        for client in clients:
+            self._close(client)
+
+    @staticmethod
+    def _close(client):
+        try:
+            client.close()
+        except Exception as exc:
+            logger.warning("Error closing AI client: %s", exc)
+
+
+ai_clients = AIClientRegistry()
+atexit.register(ai_clients.close)
@@ -1,6 +1,9 @@
 import os
 import random
 
+from ai_clients import ai_clients
+from metrics import outbound_call
+
 MOCK_AI_RESPONSES = {
     "greeting": [
         "Hello! I'm your AI travel companion. How can I help you explore today?",
@@ -25,6 +28,10 @@ MOCK_AI_RESPONSES = {
 }
 
 GOOGLE_MODEL_NAME = os.getenv("GOOGLE_AI_MODEL", "gemini-1.5-flash")
+GOOGLE_SYSTEM_INSTRUCTION = (
+    "You are a cheerful yet concise travel companion for SmartStay Navigator. "
+    "Offer practical tips, local insights, and helpful cultural etiquette."
+)
 
 
 def get_location_based_suggestions(lat, lon, query):
@@ -42,7 +49,8 @@ def get_location_based_suggestions(lat, lon, query):
         }
         headers = {'User-Agent': 'SmartStay-Navigator/1.0'}
         
-        location_response = requests.get(nominatim_url, params=params, headers=headers, timeout=5)
+        with outbound_call('nominatim'):
+            location_response = requests.get(nominatim_url, params=params, headers=headers, timeout=5)
         if location_response.status_code == 200:
             location_data = location_response.json()
             location_name = location_data.get('display_name', 'your location')
@@ -60,7 +68,8 @@ def get_location_based_suggestions(lat, lon, query):
             out body;
             """
             
-            overpass_response = requests.post(overpass_url, data=overpass_query, headers=headers, timeout=10)
+            with outbound_call('overpass'):
+                overpass_response = requests.post(overpass_url, data=overpass_query, headers=headers, timeout=10)
             places = []
             if overpass_response.status_code == 200:
                 data = overpass_response.json()
@@ -138,33 +147,25 @@ def get_ai_response(prompt, api_key=None, conversation_history=None, user_locati
 def _get_google_response(prompt, api_key):
     """Send the prompt to Google Generative AI."""
     try:
-        import google.generativeai as genai
-
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel(
-            model_name=GOOGLE_MODEL_NAME,
-            system_instruction=(
-                "You are a cheerful yet concise travel companion for SmartStay Navigator. "
-                "Offer practical tips, local insights, and helpful cultural etiquette."
-            ),
-        )
+        model = ai_clients.gemini(api_key, GOOGLE_MODEL_NAME, GOOGLE_SYSTEM_INSTRUCTION)
 
-        response = model.generate_content(
-            [
-                {
-                    "role": "user",
-                    "parts": [
-                        {
-                            "text": prompt
-                        }
-                    ],
-                }
-            ],
-            safety_settings=[
-                {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_LOW_AND_ABOVE"},
-                {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_LOW_AND_ABOVE"},
-            ],
-        )
+        with outbound_call('gemini'):
+            response = model.generate_content(
+                [
+                    {
+                        "role": "user",
+                        "parts": [
+                            {
+                                "text": prompt
+                            }
+                        ],
+                    }
+                ],
+                safety_settings=[
+                    {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_LOW_AND_ABOVE"},
+                    {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_LOW_AND_ABOVE"},
+                ],
+            )
 
         if response and getattr(response, "text", None):
             return response.text.strip()
@@ -184,10 +185,6 @@ def _get_google_response(prompt, api_key):
 def _get_openai_response(prompt, api_key, conversation_history=None):
     """Send the prompt to OpenAI ChatGPT API (modern chat completions)."""
     try:
-        from openai import OpenAI
-
-        client = OpenAI(api_key=api_key)
-        
         # Build conversation messages
         messages = [
             {
@@ -210,13 +207,14 @@ def _get_openai_response(prompt, api_key, conversation_history=None):
         # Add current user message
         messages.append({"role": "user", "content": prompt})
         
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",  # Using GPT-4o-mini for better responses at lower cost
-            messages=messages,
-            max_tokens=500,
-            temperature=0.7,
-            top_p=0.9
-        )
+        with ai_clients.openai(api_key) as client, outbound_call('openai'):
+            response = client.chat.completions.create(
+                model="gpt-4o-mini",  # Using GPT-4o-mini for better responses at lower cost
+                messages=messages,
+                max_tokens=500,
+                temperature=0.7,
+                top_p=0.9
+            )
         
         if response.choices and len(response.choices) > 0:
             return response.choices[0].message.content.strip()
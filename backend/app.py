@@ -3,56 +3,78 @@ import os
 from dotenv import load_dotenv
 from flask import Flask, jsonify
 from flask_cors import CORS
-from pymongo.errors import PyMongoError
-
-load_dotenv()
-
-from models import db  # noqa: E402
-from mongo_client import get_mongo_db, test_connection  # noqa: E402
-from routes.ai_routes import ai_bp  # noqa: E402
-from routes.auth_routes import auth_bp  # noqa: E402
-from routes.culture_routes import culture_bp  # noqa: E402
-from routes.emergency_routes import emergency_bp  # noqa: E402
-from routes.events_routes import events_bp  # noqa: E402
-from routes.map_routes import map_bp  # noqa: E402
-from routes.admin_routes import admin_bp  # noqa: E402
-from routes.social_routes import social_bp  # noqa: E402
-from routes.stays_routes import stays_bp  # noqa: E402
-from routes.tourist_routes import tourist_bp  # noqa: E402
-from routes.translator_routes import translator_bp  # noqa: E402
-
-app = Flask(__name__)
-
-# ---------------------------
-# SQLALCHEMY (SQLite)
-# ---------------------------
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///database.sqlite'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['SECRET_KEY'] = os.getenv("SECRET_KEY")  # take from .env
-app.config['AUTH_SALT'] = os.getenv('TOKEN_SALT', 'smartstay-auth')
-app.config['AUTH_TOKEN_TTL'] = int(os.getenv('TOKEN_EXP_SECONDS', 60 * 60 * 24 * 7))
-
-CORS(app)
-db.init_app(app)
-
-# ---------------------------
-# Register blueprints
-# ---------------------------
-app.register_blueprint(stays_bp)
-app.register_blueprint(tourist_bp)
-app.register_blueprint(emergency_bp)
-app.register_blueprint(culture_bp)
-app.register_blueprint(events_bp)
-app.register_blueprint(ai_bp)
-app.register_blueprint(translator_bp)
-app.register_blueprint(auth_bp)
-app.register_blueprint(social_bp)
-app.register_blueprint(map_bp)
-app.register_blueprint(admin_bp)
+from werkzeug.utils import import_string
+
+from compression import init_compression
+from interest_counter import init_interest_counter
+from json_provider import FastJSONProvider
+from metrics import init_metrics
+from models import db
+from query_stats import init_query_stats
+from storage import DEFAULT_DATABASE_URI, init_storage
+
+# Blueprints by import path.  Each module (and whatever it pulls in) is only
+# imported when create_app registers it; ``BLUEPRINTS`` in the config picks a
+# subset, e.g. ``()`` for scripts that only need the database.
+BLUEPRINTS = (
+    'routes.stays_routes:stays_bp',
+    'routes.tourist_routes:tourist_bp',
+    'routes.emergency_routes:emergency_bp',
+    'routes.culture_routes:culture_bp',
+    'routes.events_routes:events_bp',
+    'routes.ai_routes:ai_bp',
+    'routes.translator_routes:translator_bp',
+    'routes.auth_routes:auth_bp',
+    'routes.social_routes:social_bp',
+    'routes.map_routes:map_bp',
+    'routes.admin_routes:admin_bp',
+    'routes.search_routes:search_bp',
+    'routes.metrics_routes:metrics_bp',
+)
+
+
+def create_app(config=None):
+    """Build the API app; ``config`` (a mapping) overrides the environment defaults."""
+    load_dotenv()
+
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+
+    # ---------------------------
+    # SQLALCHEMY (SQLite)
+    # ---------------------------
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', DEFAULT_DATABASE_URI)
+    app.config['STORAGE_PROFILE'] = os.getenv('STORAGE_PROFILE', 'production')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SECRET_KEY'] = os.getenv("SECRET_KEY")  # take from .env
+    app.config['AUTH_SALT'] = os.getenv('TOKEN_SALT', 'smartstay-auth')
+    app.config['AUTH_TOKEN_TTL'] = int(os.getenv('TOKEN_EXP_SECONDS', 60 * 60 * 24 * 7))
+    app.config['BLUEPRINTS'] = BLUEPRINTS
+    app.config.from_mapping(config or {})
+
+    CORS(app, expose_headers=['X-Next-Cursor', 'X-DB-Query-Count', 'X-DB-Time-Ms'])
+    init_metrics(app)
+    init_storage(app)
+    init_query_stats(app)
+    init_interest_counter(app)
+    init_compression(app)
+
+    # ---------------------------
+    # Register blueprints
+    # ---------------------------
+    for path in app.config['BLUEPRINTS']:
+        app.register_blueprint(import_string(path))
+
+    app.add_url_rule('/', view_func=index)
+    app.add_url_rule('/api/health', view_func=health_check)
+    return app
 
 
 def _mongo_connected():
     """Return True when MongoDB is reachable."""
+    from pymongo.errors import PyMongoError
+    from mongo_client import get_mongo_db
+
     try:
         get_mongo_db().command('ping')
         return True
@@ -60,8 +82,9 @@ def _mongo_connected():
         return False
 
 
-@app.route('/')
 def index():
+    from mongo_client import test_connection
+
     mongo_status = test_connection()
     return jsonify({
         'message': 'SmartStay Navigator API',
@@ -74,18 +97,17 @@ def index():
     })
 
 
-@app.route('/api/health')
 def health_check():
     """Detailed health check endpoint"""
-    from mongo_client import get_users_collection
-    
+    from mongo_client import get_users_collection, test_connection
+
     mongo_status = test_connection()
     health = {
         'status': 'healthy' if mongo_status['connected'] else 'unhealthy',
         'mongodb': mongo_status,
         'flask': 'running',
     }
-    
+
     if mongo_status['connected']:
         try:
             users = get_users_collection()
@@ -93,13 +115,27 @@ def health_check():
             health['mongodb']['user_count'] = user_count
         except Exception as e:
             health['mongodb']['error'] = str(e)
-    
+
     return jsonify(health)
 
+
+def __getattr__(name):
+    # ``from app import app`` and WSGI servers pointed at ``app:app`` still
+    # get a ready app, but importing this module for create_app builds none.
+    if name == 'app':
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 if __name__ == '__main__':
+    from mongo_client import test_connection
+
+    app = create_app()
     with app.app_context():
         db.create_all()
-        
+
         # Test MongoDB connection on startup
         print("\n" + "="*50)
         print("[STARTING] SmartStay Navigator API...")
@@ -111,5 +147,5 @@ if __name__ == '__main__':
             print(f"[ERROR] MongoDB: Connection failed - {mongo_status.get('error', 'Unknown error')}")
             print("[WARNING] Authentication features may not work without MongoDB!")
         print("="*50 + "\n")
-        
+
     app.run(debug=True, port=5000)
@@ -0,0 +1,130 @@
+"""
+Cold-start benchmark with a time budget.
+
+Starts fresh interpreters that import ``app`` and call ``create_app`` and
+reports the median import and build time per scenario:
+
+    cli   no blueprints, as seed_data.py and bulk_loader.py build it
+    data  the data-serving blueprints (benchmarks.common.BENCHMARK_BLUEPRINTS)
+    full  every blueprint, as the server builds it
+
+It fails (exit 1) when a scenario's median exceeds its budget, or when a
+heavy SDK that should load on first use (``DEFERRED_MODULES``) was imported
+or a background thread was started during start-up.  ``--top`` lists the packages that take longest to
+import, from ``python -X importtime``.
+
+Usage (from backend/):
+    python -m benchmarks.bench_cold_start
+    python -m benchmarks.bench_cold_start --scenarios cli data --runs 10 --top 15
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from benchmarks.common import BACKEND_DIR
+
+# Modules each scenario must not import at start-up.
+DEFERRED_MODULES = {
+    'cli': ('openai', 'google.generativeai', 'pymongo', 'requests'),
+    'data': ('openai', 'google.generativeai', 'pymongo', 'requests'),
+    'full': ('openai', 'google.generativeai'),
+}
+BUDGET_MS = {'cli': 800, 'data': 1200, 'full': 1500}
+
+SNIPPET = '''
+import json, sys, threading, time
+started = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+config = {{'SQLALCHEMY_DATABASE_URI': 'sqlite://'}}
+blueprints = {blueprints}
+if blueprints is not None:
+    config['BLUEPRINTS'] = blueprints
+create_app(config)
+built = time.perf_counter()
+print(json.dumps({{
+    'import_ms': (imported - started) * 1000,
+    'create_ms': (built - imported) * 1000,
+    'loaded': [name for name in {deferred!r} if name in sys.modules],
+    'threads': [t.name for t in threading.enumerate() if t is not threading.main_thread()],
+}}))
+'''
+
+
+def scenario_blueprints(name):
+    if name == 'cli':
+        return ()
+    if name == 'data':
+        from benchmarks.common import BENCHMARK_BLUEPRINTS
+        return BENCHMARK_BLUEPRINTS
+    return None
+
+
+def run_once(name, importtime=False):
+    code = SNIPPET.format(blueprints=repr(scenario_blueprints(name)), deferred=DEFERRED_MODULES[name])
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', code]
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='0')
+    result = subprocess.run(command, cwd=BACKEND_DIR, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f'{name}: start-up failed\n{result.stderr.strip()[-2000:]}')
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def slowest_imports(importtime_log, top):
+    """Self import time summed per top-level package from ``-X importtime``, slowest first."""
+    totals = {}
+    for line in importtime_log.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, _, package = line[len('import time:'):].split('|')
+        root = package.strip().split('.')[0]
+        totals[root] = totals.get(root, 0) + int(self_us)
+    return sorted(((us, root) for root, us in totals.items()), reverse=True)[:top]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure cold start and enforce a budget.')
+    parser.add_argument('--scenarios', nargs='+', choices=sorted(DEFERRED_MODULES), default=['cli', 'full'])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, help='override the budget for every scenario')
+    parser.add_argument('--top', type=int, default=0, help='list the N slowest packages to import')
+    args = parser.parse_args(argv)
+
+    failures = []
+    print(f"{'scenario':<10}{'import ms':>11}{'create ms':>11}{'total ms':>10}{'budget':>8}")
+    for name in args.scenarios:
+        try:
+            run_once(name)  # warm the bytecode cache so runs compare like for like
+            results = [run_once(name)[0] for _ in range(args.runs)]
+        except RuntimeError as exc:
+            failures.append(str(exc))
+            continue
+        import_ms = statistics.median(r['import_ms'] for r in results)
+        create_ms = statistics.median(r['create_ms'] for r in results)
+        total_ms = statistics.median(r['import_ms'] + r['create_ms'] for r in results)
+        budget = args.budget_ms or BUDGET_MS[name]
+        print(f'{name:<10}{import_ms:>11.1f}{create_ms:>11.1f}{total_ms:>10.1f}{budget:>8.0f}')
+        if total_ms > budget:
+            failures.append(f'{name}: median start-up {total_ms:.0f} ms is over the {budget:.0f} ms budget')
+        loaded = sorted({module for r in results for module in r['loaded']})
+        if loaded:
+            failures.append(f"{name}: imported at start-up: {', '.join(loaded)}")
+        threads = sorted({thread for r in results for thread in r['threads']})
+        if threads:
+            failures.append(f"{name}: threads started at start-up: {', '.join(threads)}")
+        if args.top:
+            _, log = run_once(name, importtime=True)
+            for self_us, package in slowest_imports(log, args.top):
+                print(f'   {self_us / 1000:>8.1f} ms  {package}')
+
+    for failure in failures:
+        print(f'[FAIL] {failure}')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
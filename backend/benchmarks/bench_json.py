@@ -0,0 +1,110 @@
+"""
+Encode-time benchmark for the JSON providers on listing-sized payloads.
+
+Compares Flask's default provider with FastJSONProvider (orjson, and its
+standard-library fallback) on 10k stay dicts shaped like /api/stays results
+and 10k event dicts carrying datetimes.
+
+Usage (from backend/):
+    python -m benchmarks.bench_json
+    python -m benchmarks.bench_json --rows 50000 --repeat 7
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+
+import json_provider  # noqa: E402
+from json_provider import FastJSONProvider  # noqa: E402
+
+
+def stay_payload(rows):
+    rng = random.Random(1)
+    return [{
+        'id': i,
+        'name': f'Stay {i}',
+        'address': f'{i} Beach Road, Udupi',
+        'latitude': 13.3 + rng.random(),
+        'longitude': 74.7 + rng.random(),
+        'price_per_night': float(rng.randint(300, 5000)),
+        'rating': round(rng.uniform(2, 5), 1),
+        'description': 'Cozy rooms near the beach with breakfast and free WiFi. ' * 3,
+        'amenities': 'WiFi, Breakfast, AC',
+        'contact': '+91-1234567890',
+        'distance': round(rng.uniform(0, 25), 2),
+    } for i in range(rows)]
+
+
+def event_payload(rows):
+    rng = random.Random(2)
+    start = datetime(2030, 1, 1)
+    return [{
+        'id': i,
+        'title': f'Event {i}',
+        'description': 'Live music and local food by the shore.',
+        'location': 'Malpe Beach',
+        'latitude': 13.3 + rng.random(),
+        'longitude': 74.7 + rng.random(),
+        'date': start + timedelta(minutes=37 * i),
+        'contact': '',
+        'tags': 'music,food',
+        'organizer': 'Anonymous',
+        'interested_count': rng.randint(0, 500),
+        'visibility_radius_km': 10.0,
+        'created_by': 'user@example.com',
+        'created_at': start - timedelta(days=1, seconds=i),
+        'distance': round(rng.uniform(0, 10), 2),
+    } for i in range(rows)]
+
+
+def best_of(provider, payload, repeat):
+    times = []
+    with provider._app.app_context():
+        for _ in range(repeat):
+            started = time.perf_counter()
+            body = provider.response(payload).get_data()
+            times.append(time.perf_counter() - started)
+    return min(times) * 1000, len(body)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    app = Flask(__name__)
+    providers = [('flask default', DefaultJSONProvider(app)), ('fast (json fallback)', None)]
+    if json_provider.orjson is not None:
+        providers.append(('fast (orjson)', FastJSONProvider(app)))
+    else:
+        print('orjson is not installed; only the fallback is measured')
+
+    payloads = [('stays', stay_payload(args.rows)), ('events', event_payload(args.rows))]
+    print(f"{'payload':<8}{'provider':<22}{'ms':>9}{'KiB':>9}{'speedup':>9}")
+    for payload_name, payload in payloads:
+        baseline = None
+        for name, provider in providers:
+            if provider is None:
+                # The fallback path is what runs when orjson is missing.
+                saved, json_provider.orjson = json_provider.orjson, None
+                try:
+                    ms, size = best_of(FastJSONProvider(app), payload, args.repeat)
+                finally:
+                    json_provider.orjson = saved
+            else:
+                ms, size = best_of(provider, payload, args.repeat)
+            baseline = baseline or ms
+            print(f"{payload_name:<8}{name:<22}{ms:>9.1f}{size / 1024:>9.0f}{baseline / ms:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
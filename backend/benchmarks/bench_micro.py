@@ -0,0 +1,119 @@
+"""
+Micro-benchmarks for the hot request paths.
+
+Times ``calculate_distance`` (against the vectorized ``haversine_km``) and
+calls the ``get_stays``, ``get_tourist_recommendations`` and ``get_events``
+views directly inside a request context, from query points drawn from the
+same clustered distribution as the synthetic data.
+
+Usage (from backend/):
+    python -m benchmarks.bench_micro                      # fresh 10k-stay city in a temp file
+    python -m benchmarks.bench_micro --scale 100000 --iterations 500
+    python -m benchmarks.bench_micro --database-uri sqlite:////tmp/city.sqlite
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.common import benchmark_app, format_ms, latency_summary
+from benchmarks.stubs import benchmark_user
+from benchmarks.synthetic import CityModel, populate, scaled_counts
+from geo import calculate_distance, haversine_km
+
+
+def time_calls(call, args_list, warmup=5):
+    for args in args_list[:warmup]:
+        call(*args)
+    durations = []
+    for args in args_list:
+        started = time.perf_counter()
+        call(*args)
+        durations.append(time.perf_counter() - started)
+    return durations
+
+
+def bench_distance(points, pairs=100000):
+    rng = random.Random(1)
+    targets = [points[rng.randrange(len(points))] for _ in range(pairs)]
+    lat, lon = points[0]
+
+    started = time.perf_counter()
+    for t_lat, t_lon in targets:
+        calculate_distance(lat, lon, t_lat, t_lon)
+    scalar = time.perf_counter() - started
+
+    lats, lons = [t[0] for t in targets], [t[1] for t in targets]
+    started = time.perf_counter()
+    haversine_km(lat, lon, lats, lons)
+    vector = time.perf_counter() - started
+    return [
+        ('calculate_distance', f'{scalar / pairs * 1e6:.3f} us/pair', f'{pairs} pairs'),
+        ('haversine_km', f'{vector / pairs * 1e6:.3f} us/pair', f'{pairs} pairs, one call'),
+    ]
+
+
+def view_caller(app, view, path):
+    def call(query_string):
+        with app.test_request_context(path, query_string=query_string):
+            response = app.make_response(view())
+            response.get_data()
+    return call
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Micro-benchmarks for the hot request paths.')
+    parser.add_argument('--database-uri', help='existing database (default: generate a temporary one)')
+    parser.add_argument('--scale', type=int, default=10000)
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--cold', action='store_true', help='clear the recommendation cache before every call')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_uri = args.database_uri or f"sqlite:///{os.path.join(tmp, 'micro.sqlite')}"
+        app = benchmark_app(database_uri)
+        if not args.database_uri:
+            print(f'[BENCH] Generating a scale-{args.scale} city')
+            populate(app, scaled_counts(args.scale), seed=args.seed)
+
+        from routes.events_routes import get_events
+        from routes.stays_routes import get_stays
+        from routes.tourist_routes import get_tourist_recommendations, spot_cache
+
+        points = CityModel(args.seed + 1).query_points(args.iterations)
+        rows = bench_distance(points)
+
+        stays = [({'lat': lat, 'lon': lon, 'distance': 10},) for lat, lon in points]
+        recommendations = [({'lat': lat, 'lon': lon, 'limit': 10},) for lat, lon in points]
+        events = [({'lat': lat, 'lon': lon},) for lat, lon in points]
+
+        recommend = view_caller(app, get_tourist_recommendations, '/api/tourist-spots/recommendations')
+        if args.cold:
+            warm_recommend = recommend
+
+            def recommend(query_string):
+                spot_cache.invalidate()
+                warm_recommend(query_string)
+
+        timings = [
+            ('get_stays', time_calls(view_caller(app, get_stays, '/api/stays'), stays)),
+            ('get_tourist_recommendations' + (' (cold)' if args.cold else ''), time_calls(recommend, recommendations)),
+        ]
+        with benchmark_user():
+            timings.append(('get_events', time_calls(view_caller(app, get_events, '/api/events'), events)))
+
+    print(f"{'benchmark':<36}{'result':>20}  notes")
+    for name, result, notes in rows:
+        print(f'{name:<36}{result:>20}  {notes}')
+    print(f"\n{'view':<36}{'calls':>7}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, durations in timings:
+        s = latency_summary(durations)
+        print(f"{name:<36}{s['count']:>7}{format_ms(s['mean_ms']):>10}{format_ms(s['p50_ms']):>10}"
+              f"{format_ms(s['p95_ms']):>10}{format_ms(s['p99_ms']):>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+"""
+Read/write-mix benchmark for the SQLite storage profiles.
+
+Readers run the nearby-stays listing query and page event comments while
+writers post comments and interest marks, all against a fresh database
+file.  Each profile runs the same workload for the same wall time.
+
+Usage (from backend/):
+    python -m benchmarks.bench_storage
+    python -m benchmarks.bench_storage --profiles legacy production --seconds 10 --readers 8 --writers 2
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+from sqlalchemy import insert, update  # noqa: E402
+
+from models import db, Event, EventComment, Stay  # noqa: E402
+from routes.stays_routes import build_stays_query  # noqa: E402
+from storage import STORAGE_PROFILES, init_storage  # noqa: E402
+
+CENTER = (13.34, 74.74)
+
+
+def make_app(path, profile):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    app.config['STORAGE_PROFILE'] = profile
+    init_storage(app)
+    return app
+
+
+def seed(app, stays, events):
+    rng = random.Random(7)
+    with app.app_context():
+        db.create_all()
+        for i in range(stays):
+            db.session.add(Stay(
+                name=f'Stay {i}',
+                latitude=CENTER[0] + rng.uniform(-0.5, 0.5),
+                longitude=CENTER[1] + rng.uniform(-0.5, 0.5),
+                price_per_night=rng.randint(300, 5000),
+                rating=round(rng.uniform(2, 5), 1),
+                description='Seeded for the storage benchmark',
+            ))
+        start = datetime.utcnow()
+        for i in range(events):
+            db.session.add(Event(
+                title=f'Event {i}', latitude=CENTER[0], longitude=CENTER[1],
+                date=start + timedelta(days=i % 30), tags='music,food',
+            ))
+        db.session.commit()
+
+
+def reader(app, deadline, latencies, errors):
+    rng = random.Random()
+    with app.app_context():
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                build_stays_query(CENTER[0] + rng.uniform(-0.3, 0.3), CENTER[1] + rng.uniform(-0.3, 0.3), 10).all()
+                (EventComment.query.filter_by(event_id=rng.randint(1, 50))
+                 .order_by(EventComment.created_at.desc(), EventComment.id.desc()).limit(20).all())
+                db.session.rollback()
+            except Exception:
+                db.session.rollback()
+                errors.append(1)
+                continue
+            latencies.append(time.perf_counter() - started)
+
+
+def writer(app, deadline, latencies, errors):
+    rng = random.Random()
+    events = Event.__table__
+    with app.app_context():
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            event_id = rng.randint(1, 50)
+            try:
+                db.session.execute(insert(EventComment.__table__).values(
+                    event_id=event_id, author='bench', comment='Benchmark comment', created_at=datetime.utcnow(),
+                ))
+                db.session.execute(update(events).where(events.c.id == event_id)
+                                   .values(interested_count=events.c.interested_count + 1))
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                errors.append(1)
+                continue
+            latencies.append(time.perf_counter() - started)
+
+
+def run_profile(profile, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(os.path.join(tmp, 'bench.sqlite'), profile)
+        seed(app, args.stays, args.events)
+
+        reads, writes, read_errors, write_errors = [], [], [], []
+        deadline = time.perf_counter() + args.seconds
+        threads = [threading.Thread(target=reader, args=(app, deadline, reads, read_errors)) for _ in range(args.readers)]
+        threads += [threading.Thread(target=writer, args=(app, deadline, writes, write_errors)) for _ in range(args.writers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        with app.app_context():
+            db.engine.dispose()
+
+    def p95(values):
+        return statistics.quantiles(values, n=20)[-1] * 1000 if len(values) >= 20 else float('nan')
+
+    return {
+        'profile': profile,
+        'reads_per_s': len(reads) / args.seconds,
+        'writes_per_s': len(writes) / args.seconds,
+        'read_p95_ms': p95(reads),
+        'write_p95_ms': p95(writes),
+        'errors': len(read_errors) + len(write_errors),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--profiles', nargs='+', default=['legacy', 'production'], choices=sorted(STORAGE_PROFILES))
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--stays', type=int, default=5000)
+    parser.add_argument('--events', type=int, default=50)
+    args = parser.parse_args(argv)
+
+    results = [run_profile(profile, args) for profile in args.profiles]
+    print(f"{'profile':<12}{'reads/s':>10}{'writes/s':>10}{'read p95 ms':>13}{'write p95 ms':>14}{'errors':>8}")
+    for r in results:
+        print(f"{r['profile']:<12}{r['reads_per_s']:>10.0f}{r['writes_per_s']:>10.0f}"
+              f"{r['read_p95_ms']:>13.1f}{r['write_p95_ms']:>14.1f}{r['errors']:>8}")
+    if len(results) > 1 and results[0]['reads_per_s'] and results[0]['writes_per_s']:
+        base = results[0]
+        for r in results[1:]:
+            print(f"{r['profile']} vs {base['profile']}: reads x{r['reads_per_s'] / base['reads_per_s']:.2f}, "
+                  f"writes x{r['writes_per_s'] / base['writes_per_s']:.2f}")
+
+
+if __name__ == '__main__':
+    main()
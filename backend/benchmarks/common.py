@@ -0,0 +1,65 @@
+"""
+Shared setup for the benchmark scripts: the benchmark app and percentiles.
+"""
+
+import math
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from app import create_app  # noqa: E402
+from models import db  # noqa: E402
+
+# The data-serving blueprints; auth, social, map and admin need MongoDB.
+BENCHMARK_BLUEPRINTS = (
+    'routes.stays_routes:stays_bp',
+    'routes.tourist_routes:tourist_bp',
+    'routes.emergency_routes:emergency_bp',
+    'routes.culture_routes:culture_bp',
+    'routes.events_routes:events_bp',
+    'routes.ai_routes:ai_bp',
+    'routes.translator_routes:translator_bp',
+    'routes.search_routes:search_bp',
+    'routes.metrics_routes:metrics_bp',
+)
+
+
+def benchmark_app(database_uri, profile='production'):
+    """An app with the data-serving blueprints on ``database_uri`` (tables created)."""
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': database_uri,
+        'STORAGE_PROFILE': profile,
+        'BLUEPRINTS': BENCHMARK_BLUEPRINTS,
+    })
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list (None when empty)."""
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def latency_summary(seconds):
+    """Count, mean and p50/p95/p99 in milliseconds for a list of durations."""
+    values = sorted(seconds)
+    if not values:
+        return {'count': 0, 'mean_ms': None, 'p50_ms': None, 'p95_ms': None, 'p99_ms': None}
+    return {
+        'count': len(values),
+        'mean_ms': sum(values) / len(values) * 1000,
+        'p50_ms': percentile(values, 50) * 1000,
+        'p95_ms': percentile(values, 95) * 1000,
+        'p99_ms': percentile(values, 99) * 1000,
+    }
+
+
+def format_ms(value):
+    return f'{value:.2f}' if value is not None else '-'
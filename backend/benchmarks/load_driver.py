@@ -0,0 +1,213 @@
+"""
+Load driver reporting throughput and latency percentiles per endpoint.
+
+Runs a weighted mix of API calls from ``--concurrency`` threads, either
+in-process through the Flask test client (default; builds a synthetic city
+first) or against a running server with ``--url``.  AI, translation and
+geocoding backends are stubbed in-process so runs are deterministic and
+offline; against ``--url`` the server must be started with its own stubs
+or keys.
+
+Usage (from backend/):
+    python -m benchmarks.load_driver --scale 20000 --requests 5000 --concurrency 8
+    python -m benchmarks.load_driver --seconds 30 --revalidate --backend-latency-ms 150
+    python -m benchmarks.load_driver --url http://localhost:5000 --requests 2000
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from urllib.parse import urlencode
+
+from benchmarks.common import benchmark_app, format_ms, latency_summary
+from benchmarks.stubs import benchmark_user, offline_backends
+from benchmarks.synthetic import CityModel, populate, scaled_counts
+
+# name, weight, method, path, query builder, JSON body builder
+SCENARIOS = (
+    ('stays_nearby', 30, 'GET', '/api/stays', lambda p: {'lat': p[0], 'lon': p[1], 'distance': 10}, None),
+    ('stays_map_pins', 10, 'GET', '/api/stays',
+     lambda p: {'lat': p[0], 'lon': p[1], 'distance': 25, 'fields': 'id,name,latitude,longitude,distance'}, None),
+    ('stays_page', 5, 'GET', '/api/stays', lambda p: {'lat': p[0], 'lon': p[1], 'distance': 25, 'limit': 20}, None),
+    ('recommendations', 15, 'GET', '/api/tourist-spots/recommendations',
+     lambda p: {'lat': p[0], 'lon': p[1], 'limit': 10}, None),
+    ('tourist_spots_beach', 5, 'GET', '/api/tourist-spots', lambda p: {'category': 'beach', 'lat': p[0], 'lon': p[1]}, None),
+    ('events', 15, 'GET', '/api/events', lambda p: {'lat': p[0], 'lon': p[1]}, None),
+    ('emergency_all', 5, 'GET', '/api/emergency/all', lambda p: {}, None),
+    ('search', 5, 'GET', '/api/search', lambda p: {'q': 'beach', 'lat': p[0], 'lon': p[1], 'distance': 25}, None),
+    ('ai_chat', 5, 'POST', '/api/ai/chat', lambda p: {},
+     lambda p: {'message': 'What should I see nearby?', 'user_location': {'lat': p[0], 'lon': p[1]}}),
+    ('translate', 5, 'POST', '/api/translate', lambda p: {},
+     lambda p: {'text': 'Where is the beach?', 'source_lang': 'en', 'target_lang': 'hi'}),
+)
+
+
+class TestClientTransport:
+    """Sends requests through the Flask test client (one client per thread)."""
+
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+
+    def send(self, method, path, query, body, headers):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        response = client.open(path, method=method, query_string=query, json=body, headers=headers)
+        response.get_data()
+        return response.status_code, response.headers.get('ETag')
+
+
+class HTTPTransport:
+    """Sends requests to a running server with urllib."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def send(self, method, path, query, body, headers):
+        url = self.base_url + path + ('?' + urlencode(query) if query else '')
+        data = json.dumps(body).encode() if body is not None else None
+        headers = dict(headers, **({'Content-Type': 'application/json'} if data else {}))
+        request = urllib.request.Request(url, data=data, method=method, headers=headers)
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                response.read()
+                return response.status, response.headers.get('ETag')
+        except urllib.error.HTTPError as exc:
+            return exc.code, exc.headers.get('ETag')
+
+
+class LoadStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.not_modified = defaultdict(int)
+
+    def record(self, name, seconds, status):
+        with self._lock:
+            self.latencies[name].append(seconds)
+            if status == 304:
+                self.not_modified[name] += 1
+            elif status >= 400:
+                self.errors[name] += 1
+
+
+def worker(transport, plan, stats, args, deadline):
+    etags = {}
+    headers = {'Authorization': 'Bearer load-driver', 'Accept-Encoding': 'gzip'}
+    for scenario, point in plan:
+        if deadline and time.perf_counter() >= deadline:
+            return
+        name, _, method, path, build_query, build_body = scenario
+        query = build_query(point)
+        body = build_body(point) if build_body else None
+        request_headers = dict(headers)
+        cache_key = (path, tuple(sorted(query.items())))
+        if args.revalidate and method == 'GET' and cache_key in etags:
+            request_headers['If-None-Match'] = etags[cache_key]
+        started = time.perf_counter()
+        try:
+            status, etag = transport.send(method, path, query, body, request_headers)
+        except Exception:
+            status, etag = 599, None
+        stats.record(name, time.perf_counter() - started, status)
+        if etag and status == 200:
+            etags[cache_key] = etag
+
+
+def build_plans(args, points):
+    rng = random.Random(args.seed)
+    scenarios = [s for s in SCENARIOS if not args.only or s[0] in args.only]
+    weights = [s[1] for s in scenarios]
+    total = args.requests if not args.seconds else 10 ** 7
+    per_thread = max(total // args.concurrency, 1)
+    plans = []
+    for _ in range(args.concurrency):
+        # Revisiting a limited set of points makes caches and ETags matter,
+        # as with real users around the same hotspots.
+        plans.append(((rng.choices(scenarios, weights)[0], points[rng.randrange(len(points))])
+                      for _ in range(per_thread)))
+    return plans
+
+
+def run(transport, args, points):
+    stats = LoadStats()
+    deadline = time.perf_counter() + args.seconds if args.seconds else None
+    threads = [threading.Thread(target=worker, args=(transport, plan, stats, args, deadline))
+               for plan in build_plans(args, points)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return stats, time.perf_counter() - started
+
+
+def report(stats, elapsed, output=None):
+    results = {}
+    print(f"{'endpoint':<22}{'reqs':>7}{'req/s':>9}{'err':>6}{'304':>6}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    names = sorted(stats.latencies)
+    all_latencies = []
+    for name in names:
+        latencies = stats.latencies[name]
+        all_latencies.extend(latencies)
+        s = latency_summary(latencies)
+        results[name] = dict(s, throughput=len(latencies) / elapsed, errors=stats.errors[name],
+                             not_modified=stats.not_modified[name])
+        print(f"{name:<22}{s['count']:>7}{len(latencies) / elapsed:>9.1f}{stats.errors[name]:>6}"
+              f"{stats.not_modified[name]:>6}{format_ms(s['p50_ms']):>9}{format_ms(s['p95_ms']):>9}{format_ms(s['p99_ms']):>9}")
+    s = latency_summary(all_latencies)
+    total_errors = sum(stats.errors.values())
+    results['total'] = dict(s, throughput=len(all_latencies) / elapsed, errors=total_errors, elapsed_s=elapsed)
+    print(f"{'TOTAL':<22}{s['count']:>7}{len(all_latencies) / elapsed:>9.1f}{total_errors:>6}"
+          f"{sum(stats.not_modified.values()):>6}{format_ms(s['p50_ms']):>9}{format_ms(s['p95_ms']):>9}{format_ms(s['p99_ms']):>9}")
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Drive a weighted endpoint mix and report latency percentiles.')
+    parser.add_argument('--url', help='base URL of a running server (default: in-process test client)')
+    parser.add_argument('--database-uri', help='existing database for in-process runs (default: generate one)')
+    parser.add_argument('--scale', type=int, default=10000)
+    parser.add_argument('--requests', type=int, default=2000, help='total requests (ignored with --seconds)')
+    parser.add_argument('--seconds', type=float, help='run for a fixed time instead')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--hot-points', type=int, default=200, help='distinct query locations')
+    parser.add_argument('--revalidate', action='store_true', help='send If-None-Match like a browser cache')
+    parser.add_argument('--backend-latency-ms', type=float, default=0.0, help='simulated AI/translation latency')
+    parser.add_argument('--only', nargs='+', metavar='SCENARIO', help=f"subset of: {', '.join(s[0] for s in SCENARIOS)}")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='write results as JSON')
+    args = parser.parse_args(argv)
+
+    points = CityModel(args.seed + 1).query_points(args.hot_points)
+    if args.url:
+        stats, elapsed = run(HTTPTransport(args.url), args, points)
+        report(stats, elapsed, args.output)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_uri = args.database_uri or f"sqlite:///{os.path.join(tmp, 'load.sqlite')}"
+        app = benchmark_app(database_uri)
+        if not args.database_uri:
+            print(f'[LOAD] Generating a scale-{args.scale} city')
+            populate(app, scaled_counts(args.scale), seed=args.seed)
+        with offline_backends(latency_ms=args.backend_latency_ms) as calls, benchmark_user():
+            stats, elapsed = run(TestClientTransport(app), args, points)
+        report(stats, elapsed, args.output)
+        if calls.counts:
+            print('stubbed backend calls: ' + ', '.join(f'{k}={v}' for k, v in sorted(calls.counts.items())))
+
+
+if __name__ == '__main__':
+    main()
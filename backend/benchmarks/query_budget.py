@@ -0,0 +1,79 @@
+"""
+Query-count budgets per endpoint.
+
+Requests each endpoint in ``QUERY_BUDGETS`` against a synthetic city under
+``max_queries`` and exits non-zero when one runs more SQL statements than
+its budget, listing them.  Counts do not grow with the data, so a small
+city is enough; run it before merging changes to a route.
+
+Usage (from backend/):
+    python -m benchmarks.query_budget
+    python -m benchmarks.query_budget --database-uri sqlite:////tmp/city.sqlite
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+from benchmarks.common import benchmark_app
+from benchmarks.stubs import benchmark_user
+from benchmarks.synthetic import populate, scaled_counts
+from query_stats import max_queries
+
+LAT, LON = 13.3409, 74.7421
+
+# path, maximum statements
+QUERY_BUDGETS = (
+    (f'/api/stays?lat={LAT}&lon={LON}&distance=10', 2),
+    (f'/api/stays?lat={LAT}&lon={LON}&distance=10&limit=20', 3),
+    ('/api/stays/1', 2),
+    (f'/api/tourist-spots?lat={LAT}&lon={LON}', 2),
+    (f'/api/tourist-spots/recommendations?lat={LAT}&lon={LON}&limit=10', 3),
+    ('/api/tourist-spots/1', 2),
+    (f'/api/events?lat={LAT}&lon={LON}', 1),
+    (f'/api/events?lat={LAT}&lon={LON}&limit=20', 1),
+    (f'/api/search?q=beach&lat={LAT}&lon={LON}', 6),
+    ('/api/emergency/all', 0),
+)
+
+
+def check_budgets(app):
+    """Return a list of failure messages (empty when every endpoint is within budget)."""
+    failures = []
+    client = app.test_client()
+    with benchmark_user(), app.app_context():
+        for path, budget in QUERY_BUDGETS:
+            try:
+                with max_queries(budget) as statements:
+                    response = client.get(path)
+            except AssertionError as exc:
+                failures.append(f'{path}\n{exc}')
+                continue
+            if response.status_code != 200:
+                failures.append(f'{path} returned {response.status_code}')
+                continue
+            print(f'   ok  {len(statements)}/{budget}  {path}')
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check SQL statement budgets per endpoint.')
+    parser.add_argument('--database-uri', help='existing database (default: generate a small temporary one)')
+    parser.add_argument('--scale', type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_uri = args.database_uri or f"sqlite:///{os.path.join(tmp, 'budget.sqlite')}"
+        app = benchmark_app(database_uri)
+        if not args.database_uri:
+            populate(app, scaled_counts(args.scale), verbose=False)
+        failures = check_budgets(app)
+
+    for failure in failures:
+        print(f'[FAIL] {failure}')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""
+Offline stand-ins for the external services the API calls.
+
+``offline_backends()`` patches outbound HTTP (translation, geocoding,
+Overpass) and the OpenAI/Gemini calls with deterministic canned answers,
+optionally after a fixed simulated latency, so benchmark runs are
+repeatable and need no network or API keys.  Any other outbound request
+fails loudly instead of reaching the internet.
+
+``benchmark_user()`` logs every request in as a fixed user so endpoints
+behind login (events) can be driven without tokens.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+BENCH_USER = {'id': 'bench-user', 'email': 'bench@example.com', 'name': 'Benchmark User'}
+
+
+class StubCalls:
+    """Thread-safe count of stubbed calls per backend."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = Counter()
+
+    def record(self, backend):
+        with self._lock:
+            self.counts[backend] += 1
+
+
+def _digest(text):
+    return hashlib.sha1(text.encode()).hexdigest()[:8]
+
+
+def _json_response(url, payload, status=200):
+    response = requests.Response()
+    response.status_code = status
+    response.url = url
+    response.headers['Content-Type'] = 'application/json'
+    response._content = json.dumps(payload).encode()
+    return response
+
+
+def _params(url, params, data):
+    values = {key: value[0] for key, value in parse_qs(urlparse(url).query).items()}
+    for extra in (params, data):
+        if isinstance(extra, dict):
+            values.update(extra)
+    return values
+
+
+def _stub_http(method, url, params=None, data=None):
+    """Canned response for an outbound request, keyed by host; returns (backend, response)."""
+    host = urlparse(url).hostname or ''
+    values = _params(url, params, data)
+    text = str(values.get('q', ''))
+    if host == 'translate.googleapis.com':
+        target = values.get('tl', 'en')
+        return 'google_translate', _json_response(url, [[[f'[{target}] {text}', text, None, None]], None, 'en'])
+    if host.endswith('libretranslate.de'):
+        return 'libretranslate', _json_response(url, {'translatedText': f"[{values.get('target')}] {text}"})
+    if host == 'api.mymemory.translated.net':
+        target = str(values.get('langpair', '|')).split('|')[-1]
+        return 'mymemory', _json_response(url, {'responseStatus': 200, 'responseData': {'translatedText': f'[{target}] {text}'}})
+    if host == 'nominatim.openstreetmap.org':
+        lat, lon = float(values.get('lat', 0)), float(values.get('lon', 0))
+        return 'nominatim', _json_response(url, {'display_name': f'Synthetic place near {lat:.3f}, {lon:.3f}'})
+    if host == 'overpass-api.de':
+        elements = [{'tags': {'name': f'Stub Cafe {i}', 'amenity': 'cafe'}} for i in range(5)]
+        return 'overpass', _json_response(url, {'elements': elements})
+    raise requests.ConnectionError(f'Outbound request to {url} blocked by offline_backends()')
+
+
+@contextmanager
+def offline_backends(latency_ms=0.0, ai_provider='openai'):
+    """
+    Patch external services for the duration of the block; yields StubCalls.
+
+    ``latency_ms`` is slept before each stubbed answer to emulate the
+    network.  ``ai_provider`` ('openai', 'gemini' or 'mock') picks which AI
+    path the app takes; the first two are answered by stubs.
+    """
+    import ai_helper
+
+    calls = StubCalls()
+    delay = latency_ms / 1000
+
+    def fake_session_request(session, method, url, params=None, data=None, **kwargs):
+        backend, response = _stub_http(method, url, params, data)
+        calls.record(backend)
+        if delay:
+            time.sleep(delay)
+        return response
+
+    def fake_ai(provider):
+        def answer(prompt, *args, **kwargs):
+            calls.record(provider)
+            if delay:
+                time.sleep(delay)
+            return f'({provider} stub {_digest(prompt)}) Visit the old town in the morning and the beach at sunset.'
+        return answer
+
+    env = {'OPENAI_API_KEY': '', 'GOOGLE_API_KEY': ''}
+    if ai_provider == 'openai':
+        env['OPENAI_API_KEY'] = 'stub-openai-key'
+    elif ai_provider == 'gemini':
+        env['GOOGLE_API_KEY'] = 'stub-google-key'
+
+    with ExitStack() as stack:
+        stack.enter_context(mock.patch.dict(os.environ, env))
+        stack.enter_context(mock.patch.object(requests.Session, 'request', fake_session_request))
+        stack.enter_context(mock.patch.object(ai_helper, '_get_openai_response', fake_ai('openai')))
+        stack.enter_context(mock.patch.object(ai_helper, '_get_google_response', fake_ai('gemini')))
+        yield calls
+
+
+@contextmanager
+def benchmark_user(user=BENCH_USER):
+    """Treat every request as coming from ``user``."""
+    import routes.events_routes
+    import routes.search_routes
+
+    with ExitStack() as stack:
+        for module in (routes.events_routes, routes.search_routes):
+            stack.enter_context(mock.patch.object(module, 'get_optional_user', lambda: user))
+        yield user
@@ -0,0 +1,269 @@
+"""
+Synthetic city generator for benchmarks.
+
+Generates stays, tourist spots, events and friends clustered the way real
+listings are: most rows sit in dense city cores, a share piles up around a
+few hotspots per city (beaches, temples, old towns) and the rest spread into
+the suburbs.  Output is fully determined by ``--seed`` (event dates are
+relative to the day of the run so they stay upcoming).
+
+Rows go through ``bulk_ingest`` so derived columns and indexes match what
+the API writes.  Scales from 10^3 to 10^6 rows per table.
+
+Usage (from backend/):
+    python -m benchmarks.synthetic sqlite:////tmp/city.sqlite --scale 100000
+    python -m benchmarks.synthetic sqlite:////tmp/city.sqlite --stays 1000000 --spots 0 --events 0 --friends 0
+"""
+
+import argparse
+import math
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import insert
+
+from benchmarks.common import benchmark_app
+from bulk_ingest import bulk_insert
+from models import db, Friend
+
+KM_PER_DEGREE = 111.32
+
+# name, latitude, longitude, share of rows, core spread (km)
+CITIES = (
+    ('Udupi', 13.3409, 74.7421, 1.0, 3.0),
+    ('Mangaluru', 12.9141, 74.8560, 2.0, 5.0),
+    ('Goa', 15.4909, 73.8278, 3.0, 12.0),
+    ('Mysuru', 12.2958, 76.6394, 2.0, 5.0),
+    ('Bengaluru', 12.9716, 77.5946, 8.0, 10.0),
+    ('Kochi', 9.9312, 76.2673, 2.5, 6.0),
+    ('Chennai', 13.0827, 80.2707, 6.0, 9.0),
+    ('Mumbai', 19.0760, 72.8777, 8.0, 10.0),
+    ('Jaipur', 26.9124, 75.7873, 3.0, 6.0),
+    ('Delhi', 28.6139, 77.2090, 9.0, 12.0),
+)
+HOTSPOTS_PER_CITY = 5
+HOTSPOT_SPREAD_KM = 0.6
+CORE_SHARE, HOTSPOT_SHARE = 0.65, 0.25  # the rest spreads into the suburbs
+SUBURB_SPREAD_FACTOR = 3.5
+
+STAY_KINDS = (('Hostel', 600), ('Homestay', 1200), ('Guesthouse', 1500), ('Hotel', 3500), ('Resort', 8000))
+AMENITIES = ('WiFi', 'Breakfast', 'AC', 'Parking', 'Pool', 'Restaurant', 'Laundry', 'Airport Shuttle')
+SPOT_CATEGORIES = ('beach', 'temple', 'museum', 'park', 'market', 'viewpoint', 'fort', 'lake')
+EVENT_KINDS = (
+    ('Music Night', 'music,nightlife'), ('Food Festival', 'food,festival'), ('Beach Cleanup', 'volunteer,beach'),
+    ('Heritage Walk', 'culture,walking'), ('Yoga Session', 'wellness,yoga'), ('Craft Market', 'shopping,art'),
+    ('Temple Festival', 'culture,festival'), ('Sunset Trek', 'adventure,nature'),
+)
+STATUSES = ('Exploring the old town', 'At the beach', 'Looking for dinner plans', 'On a day trip', 'Back at the hostel')
+VISIBILITY_RADII = (5.0, 10.0, 10.0, 10.0, 25.0, 50.0)
+
+
+def scaled_counts(scale):
+    """Default table sizes for a scale (the number of stays)."""
+    return {'stays': scale, 'tourist_spots': max(scale // 5, 1), 'events': max(scale // 20, 1), 'friends': max(scale // 100, 1)}
+
+
+class CityModel:
+    """Seeded sampler of clustered coordinates across ``CITIES``."""
+
+    def __init__(self, seed):
+        self.rng = np.random.default_rng(seed)
+        weights = np.array([city[3] for city in CITIES])
+        self.city_p = weights / weights.sum()
+        self.hotspots = [
+            [self._offset(lat, lon, *self.rng.normal(0, spread, 2)) for _ in range(HOTSPOTS_PER_CITY)]
+            for _, lat, lon, _, spread in CITIES
+        ]
+
+    @staticmethod
+    def _offset(lat, lon, east_km, north_km):
+        return (lat + north_km / KM_PER_DEGREE,
+                lon + east_km / (KM_PER_DEGREE * math.cos(math.radians(lat))))
+
+    def points(self, n):
+        """Return (city index, lats, lons) arrays for ``n`` clustered points."""
+        rng = self.rng
+        city = rng.choice(len(CITIES), size=n, p=self.city_p)
+        centre_lat = np.array([c[1] for c in CITIES])[city]
+        centre_lon = np.array([c[2] for c in CITIES])[city]
+        spread = np.array([c[4] for c in CITIES])[city]
+
+        mode = rng.random(n)
+        hotspot = (mode >= CORE_SHARE) & (mode < CORE_SHARE + HOTSPOT_SHARE)
+        suburb = mode >= CORE_SHARE + HOTSPOT_SHARE
+        picks = rng.integers(HOTSPOTS_PER_CITY, size=n)
+        for i in np.nonzero(hotspot)[0]:
+            centre_lat[i], centre_lon[i] = self.hotspots[city[i]][picks[i]]
+        spread = np.where(hotspot, HOTSPOT_SPREAD_KM, np.where(suburb, spread * SUBURB_SPREAD_FACTOR, spread))
+
+        north, east = rng.normal(0, 1, (2, n)) * spread
+        lats = centre_lat + north / KM_PER_DEGREE
+        lons = centre_lon + east / (KM_PER_DEGREE * np.cos(np.radians(centre_lat)))
+        return city, lats, lons
+
+    def query_points(self, n):
+        """Points to query from, drawn from the same distribution as the data."""
+        _, lats, lons = self.points(n)
+        return list(zip(lats.tolist(), lons.tolist()))
+
+
+def iter_stays(model, n, batch=10000):
+    rng = model.rng
+    for start in range(0, n, batch):
+        size = min(batch, n - start)
+        city, lats, lons = model.points(size)
+        kinds = rng.integers(len(STAY_KINDS), size=size)
+        prices = rng.lognormal(0, 0.35, size)
+        ratings = np.clip(rng.normal(4.0, 0.55, size), 1, 5)
+        amenity_masks = rng.random((size, len(AMENITIES))) < 0.45
+        for i in range(size):
+            kind, base_price = STAY_KINDS[kinds[i]]
+            city_name = CITIES[city[i]][0]
+            yield {
+                'name': f'{city_name} {kind} {start + i}',
+                'address': f'{(start + i) % 300 + 1} Main Road, {city_name}',
+                'latitude': lats[i],
+                'longitude': lons[i],
+                'price_per_night': round(base_price * prices[i] / 50) * 50,
+                'rating': round(float(ratings[i]), 1),
+                'description': f'{kind} in {city_name} close to local sights, with friendly hosts and clean rooms.',
+                'amenities': ', '.join(a for a, on in zip(AMENITIES, amenity_masks[i]) if on),
+                'contact': f'+91-{9000000000 + start + i}',
+            }
+
+
+def iter_spots(model, n, batch=10000):
+    rng = model.rng
+    for start in range(0, n, batch):
+        size = min(batch, n - start)
+        city, lats, lons = model.points(size)
+        categories = rng.integers(len(SPOT_CATEGORIES), size=size)
+        ratings = np.clip(rng.normal(4.2, 0.5, size), 1, 5)
+        for i in range(size):
+            category = SPOT_CATEGORIES[categories[i]]
+            city_name = CITIES[city[i]][0]
+            yield {
+                'name': f'{city_name} {category.title()} {start + i}',
+                'latitude': lats[i],
+                'longitude': lons[i],
+                'description': f'A popular {category} in {city_name}.',
+                'category': category,
+                'image_url': None,
+                'rating': round(float(ratings[i]), 1),
+            }
+
+
+def iter_events(model, n, batch=10000):
+    rng = model.rng
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    for start in range(0, n, batch):
+        size = min(batch, n - start)
+        city, lats, lons = model.points(size)
+        kinds = rng.integers(len(EVENT_KINDS), size=size)
+        hours = rng.integers(-7 * 24, 60 * 24, size=size)  # some already past
+        radii = rng.integers(len(VISIBILITY_RADII), size=size)
+        for i in range(size):
+            title, tags = EVENT_KINDS[kinds[i]]
+            city_name = CITIES[city[i]][0]
+            yield {
+                'title': f'{title} in {city_name}',
+                'description': f'{title} for travellers and locals. Everyone welcome.',
+                'location': city_name,
+                'latitude': lats[i],
+                'longitude': lons[i],
+                'date': (today + timedelta(hours=int(hours[i]))).isoformat(),
+                'tags': tags,
+                'organizer': f'{city_name} Travellers Club',
+                'visibility_radius_km': VISIBILITY_RADII[radii[i]],
+            }
+
+
+def iter_friends(model, n, batch=10000):
+    rng = model.rng
+    now = datetime.utcnow()
+    for start in range(0, n, batch):
+        size = min(batch, n - start)
+        city, lats, lons = model.points(size)
+        statuses = rng.integers(len(STATUSES), size=size)
+        online = rng.random(size) < 0.3
+        minutes = rng.integers(0, 3 * 24 * 60, size=size)
+        for i in range(size):
+            city_name = CITIES[city[i]][0]
+            yield {
+                'name': f'Traveller {start + i}',
+                'avatar_url': None,
+                'latitude': float(lats[i]),
+                'longitude': float(lons[i]),
+                'status': STATUSES[statuses[i]],
+                'favorite_place': f'{city_name} old town',
+                'home_city': city_name,
+                'last_checked_in': now - timedelta(minutes=int(minutes[i])),
+                'is_online': bool(online[i]),
+            }
+
+
+def _insert_friends(rows, chunk_size):
+    table = Friend.__table__
+    inserted, chunk = 0, []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            with db.engine.begin() as connection:
+                connection.execute(insert(table), chunk)
+            inserted += len(chunk)
+            chunk = []
+    if chunk:
+        with db.engine.begin() as connection:
+            connection.execute(insert(table), chunk)
+        inserted += len(chunk)
+    return inserted
+
+
+def populate(app, counts, seed=42, chunk_size=5000, verbose=True):
+    """Generate and insert ``counts`` rows per table; returns rows inserted per table."""
+    model = CityModel(seed)
+    generators = {'stays': iter_stays, 'tourist_spots': iter_spots, 'events': iter_events}
+    inserted = {}
+    with app.app_context():
+        for kind, generate in generators.items():
+            if not counts.get(kind):
+                continue
+            started = time.perf_counter()
+            report = bulk_insert(kind, generate(model, counts[kind]), chunk_size=chunk_size,
+                                 defaults={'created_by': 'synthetic'})
+            inserted[kind] = report['inserted']
+            if verbose:
+                print(f'   - {report["inserted"]} {kind} in {time.perf_counter() - started:.1f}s')
+        if counts.get('friends'):
+            started = time.perf_counter()
+            inserted['friends'] = _insert_friends(iter_friends(model, counts['friends']), chunk_size)
+            if verbose:
+                print(f'   - {inserted["friends"]} friends in {time.perf_counter() - started:.1f}s')
+    return inserted
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate a synthetic clustered dataset.')
+    parser.add_argument('database_uri', help='e.g. sqlite:////tmp/city.sqlite')
+    parser.add_argument('--scale', type=int, default=10000, help='number of stays; other tables scale from it')
+    parser.add_argument('--stays', type=int)
+    parser.add_argument('--spots', type=int)
+    parser.add_argument('--events', type=int)
+    parser.add_argument('--friends', type=int)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    counts = scaled_counts(args.scale)
+    for kind, value in (('stays', args.stays), ('tourist_spots', args.spots),
+                        ('events', args.events), ('friends', args.friends)):
+        if value is not None:
+            counts[kind] = value
+
+    print(f'[SYNTH] Generating into {args.database_uri} (seed {args.seed})')
+    populate(benchmark_app(args.database_uri), counts, seed=args.seed, chunk_size=args.chunk_size)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,245 @@
+"""
+Bulk ingest for partner inventories of stays, tourist spots and events.
+
+Records are validated in memory and written with Core ``executemany``
+inserts, one transaction per ``BULK_CHUNK_SIZE`` rows.  Core inserts bypass
+the ORM hooks in models.py, so the derived columns (``geocell``,
+``rating_score``) and the event cell/tag indexes are filled in here; the
+full-text triggers still fire on their own.  A record that fails validation,
+or a row the database rejects, is reported by its index in the input
+without aborting the rest of the batch.
+"""
+
+import math
+from datetime import datetime
+from itertools import islice
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DBAPIError
+
+import geo
+from models import (
+    db, Event, EventCell, EventTag, Stay, TouristSpot,
+    event_cell_rows, event_tag_rows, parse_event_datetime, spot_rating_score,
+)
+
+BULK_CHUNK_SIZE = 1000
+MAX_BULK_RECORDS = 10000  # Per HTTP request; the CLI loader streams files of any size
+
+
+def _text(value):
+    if isinstance(value, (dict, list, bool)):
+        raise ValueError('must be a string')
+    return str(value)
+
+
+def _number(low=None, high=None):
+    def convert(value):
+        if isinstance(value, bool):
+            raise ValueError('must be a number')
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            raise ValueError('must be a number')
+        if not math.isfinite(number):
+            raise ValueError('must be a finite number')
+        if (low is not None and number < low) or (high is not None and number > high):
+            raise ValueError(f'must be between {low} and {high}' if high is not None else f'must be at least {low}')
+        return number
+    return convert
+
+
+def _datetime(value):
+    try:
+        return parse_event_datetime(value)
+    except (AttributeError, TypeError, ValueError):
+        raise ValueError('must be an ISO 8601 datetime')
+
+
+_LATITUDE = _number(-90, 90)
+_LONGITUDE = _number(-180, 180)
+_RATING = _number(0, 5)
+
+# field -> (converter, required)
+STAY_FIELDS = {
+    'name': (_text, True),
+    'address': (_text, False),
+    'latitude': (_LATITUDE, True),
+    'longitude': (_LONGITUDE, True),
+    'price_per_night': (_number(0), False),
+    'rating': (_RATING, False),
+    'description': (_text, False),
+    'amenities': (_text, False),
+    'contact': (_text, False),
+}
+
+SPOT_FIELDS = {
+    'name': (_text, True),
+    'latitude': (_LATITUDE, True),
+    'longitude': (_LONGITUDE, True),
+    'description': (_text, False),
+    'category': (_text, False),
+    'image_url': (_text, False),
+    'rating': (_RATING, False),
+}
+
+EVENT_FIELDS = {
+    'title': (_text, True),
+    'description': (_text, False),
+    'location': (_text, False),
+    'latitude': (_LATITUDE, False),
+    'longitude': (_LONGITUDE, False),
+    'date': (_datetime, False),
+    'contact': (_text, False),
+    'tags': (_text, False),
+    'organizer': (_text, False),
+    'visibility_radius_km': (_number(0), False),
+}
+
+
+def validate_record(record, fields, table):
+    """Convert one input record into a row for ``table``; returns (row, errors)."""
+    if not isinstance(record, dict):
+        return None, ['record must be a JSON object']
+    row, errors = {}, []
+    for name, (convert, required) in fields.items():
+        value = record.get(name)
+        if value is None or value == '':
+            if required:
+                errors.append(f'{name} is required')
+            row[name] = None
+            continue
+        try:
+            value = convert(value)
+        except ValueError as exc:
+            errors.append(f'{name} {exc}')
+            continue
+        length = getattr(table.c[name].type, 'length', None)
+        if length and isinstance(value, str) and len(value) > length:
+            errors.append(f'{name} must be at most {length} characters')
+            continue
+        row[name] = value
+    return row, errors
+
+
+def _prepare_stay(record, defaults):
+    row, errors = validate_record(record, STAY_FIELDS, Stay.__table__)
+    if not errors:
+        row['geocell'] = geo.geocell(row['latitude'], row['longitude'])
+    return row, errors
+
+
+def _prepare_spot(record, defaults):
+    row, errors = validate_record(record, SPOT_FIELDS, TouristSpot.__table__)
+    if not errors:
+        row['rating_score'] = spot_rating_score(row['rating'])
+        row['geocell'] = geo.geocell(row['latitude'], row['longitude'])
+    return row, errors
+
+
+def _prepare_event(record, defaults):
+    from ai_helper import moderate_content
+
+    row, errors = validate_record(record, EVENT_FIELDS, Event.__table__)
+    if errors:
+        return row, errors
+    is_valid, message = moderate_content((row['description'] or '') + ' ' + row['title'])
+    if not is_valid:
+        return row, [message]
+    if row['date'] is None:
+        row['date'] = datetime.utcnow()
+    if row['visibility_radius_km'] is None:
+        row['visibility_radius_km'] = 10.0
+    row['organizer'] = row['organizer'] or defaults.get('organizer') or 'Anonymous'
+    row['created_by'] = defaults.get('created_by') or 'anonymous'
+    return row, errors
+
+
+def _insert_rows(connection, table, rows):
+    connection.execute(insert(table), rows)
+
+
+def _insert_events(connection, table, rows):
+    # Event ids are needed for the reverse-radius and tag indexes, which the
+    # ORM would otherwise maintain in its after_insert hook.
+    stmt = insert(table).returning(table.c.id, sort_by_parameter_order=True)
+    ids = connection.execute(stmt, rows).scalars().all()
+    cells, tags = [], []
+    for event_id, row in zip(ids, rows):
+        cells.extend(event_cell_rows(event_id, row['latitude'], row['longitude'], row['visibility_radius_km']))
+        tags.extend(event_tag_rows(event_id, row['tags']))
+    if cells:
+        connection.execute(insert(EventCell.__table__), cells)
+    if tags:
+        connection.execute(insert(EventTag.__table__), tags)
+
+
+# kind -> (table, prepare, insert)
+BULK_KINDS = {
+    'stays': (Stay.__table__, _prepare_stay, _insert_rows),
+    'tourist_spots': (TouristSpot.__table__, _prepare_spot, _insert_rows),
+    'events': (Event.__table__, _prepare_event, _insert_events),
+}
+
+
+def _write_chunk(table, write, indexed_rows, report):
+    """Insert a chunk in one transaction, isolating rejected rows on failure."""
+    try:
+        with db.engine.begin() as connection:
+            write(connection, table, [row for _, row in indexed_rows])
+        report['inserted'] += len(indexed_rows)
+        return
+    except DBAPIError:
+        pass
+
+    # Something in the chunk violated a constraint; retry row by row so only
+    # the offending records are rejected.
+    for index, row in indexed_rows:
+        try:
+            with db.engine.begin() as connection:
+                write(connection, table, [row])
+            report['inserted'] += 1
+        except DBAPIError as exc:
+            report['failed'] += 1
+            report['errors'].append({'index': index, 'errors': [str(exc.orig)]})
+
+
+def bulk_insert(kind, records, chunk_size=BULK_CHUNK_SIZE, defaults=None):
+    """
+    Validate and insert an iterable of records of one kind.
+
+    ``records`` may be a generator, so files larger than memory can be
+    streamed.  ``defaults`` supplies ``organizer``/``created_by`` for events.
+    Returns a report with ``received``, ``inserted``, ``failed`` and
+    per-record ``errors`` (``{'index', 'errors'}``).
+    """
+    table, prepare, write = BULK_KINDS[kind]
+    defaults = defaults or {}
+    report = {'received': 0, 'inserted': 0, 'failed': 0, 'errors': []}
+    records = enumerate(records)
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            return report
+        report['received'] += len(chunk)
+        valid = []
+        for index, record in chunk:
+            row, errors = prepare(record, defaults)
+            if errors:
+                report['failed'] += 1
+                report['errors'].append({'index': index, 'errors': errors})
+            else:
+                valid.append((index, row))
+        if valid:
+            _write_chunk(table, write, valid, report)
+
+
+def bulk_records(payload):
+    """Extract the record list from a bulk request body; returns (records, error)."""
+    if isinstance(payload, dict):
+        payload = payload.get('items')
+    if not isinstance(payload, list):
+        return None, 'Expected a JSON array of records (or an object with an "items" array)'
+    if len(payload) > MAX_BULK_RECORDS:
+        return None, f'At most {MAX_BULK_RECORDS} records per request; use bulk_loader.py for larger imports'
+    return payload, None
@@ -0,0 +1,130 @@
+"""
+Load partner inventories into the database in bulk.
+
+Usage:
+    python bulk_loader.py stays partner_stays.json
+    python bulk_loader.py tourist_spots spots.csv --chunk-size 5000
+    python bulk_loader.py events events.ndjson --created-by partner-feed --errors rejected.json
+
+Input may be a JSON array, NDJSON (one object per line) or CSV with a
+header row; the format is taken from the file extension unless --format is
+given.  Files are read incrementally and loaded ``--chunk-size`` rows per
+transaction, so they may be larger than memory; only a JSON object wrapping
+an ``items`` array is parsed whole.  Rows that fail validation are reported
+and skipped; the rest of the file is still loaded.
+"""
+
+import argparse
+import csv
+import json
+import re
+import sys
+
+from app import create_app
+from bulk_ingest import BULK_CHUNK_SIZE, BULK_KINDS, bulk_insert
+
+JSON_READ_SIZE = 1 << 16
+WHITESPACE = re.compile(r'\s*')
+
+
+def read_json(path):
+    """
+    Yield the records of a JSON array one at a time.
+
+    The file is read in ``JSON_READ_SIZE`` blocks, so an array larger than
+    memory loads like NDJSON; an ``{"items": [...]}`` wrapper is parsed whole.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, encoding='utf-8') as f:
+        buffer = f.read(JSON_READ_SIZE).lstrip()
+        if not buffer.startswith('['):
+            payload = json.loads(buffer + f.read())
+            if isinstance(payload, dict):
+                payload = payload.get('items', [])
+            yield from payload
+            return
+
+        pos, eof, expect_value = 1, False, True
+        while True:
+            pos = WHITESPACE.match(buffer, pos).end()
+            if pos < len(buffer) and buffer[pos] == ']':
+                return
+            if pos < len(buffer) and not expect_value:
+                if buffer[pos] != ',':
+                    raise ValueError(f'{path}: expected "," or "]" in the JSON array')
+                pos, expect_value = pos + 1, True
+                continue
+            if pos < len(buffer):
+                try:
+                    record, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                else:
+                    # A value running to the end of the buffer may continue in the next block.
+                    if end < len(buffer) or eof:
+                        yield record
+                        pos, expect_value = end, False
+                        continue
+            if eof:
+                raise ValueError(f'{path}: unterminated JSON array')
+            block = f.read(JSON_READ_SIZE)
+            buffer, pos, eof = buffer[pos:] + block, 0, not block
+
+
+def read_ndjson(path):
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                yield line  # Reported as an invalid record, keeping its index
+
+
+def read_csv(path):
+    with open(path, encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f):
+            yield {key: (value if value != '' else None) for key, value in row.items()}
+
+
+READERS = {'json': read_json, 'ndjson': read_ndjson, 'jsonl': read_ndjson, 'csv': read_csv}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Bulk-load stays, tourist spots or events.')
+    parser.add_argument('kind', choices=sorted(BULK_KINDS))
+    parser.add_argument('path')
+    parser.add_argument('--format', choices=sorted(READERS), help='input format (default: from extension)')
+    parser.add_argument('--chunk-size', type=int, default=BULK_CHUNK_SIZE, help='rows per transaction')
+    parser.add_argument('--created-by', default='bulk-loader', help='created_by recorded on events')
+    parser.add_argument('--errors', help='write per-row errors to this JSON file')
+    args = parser.parse_args(argv)
+
+    fmt = args.format or args.path.rsplit('.', 1)[-1].lower()
+    if fmt not in READERS:
+        parser.error(f'cannot infer the format of {args.path}; pass --format')
+
+    app = create_app({'BLUEPRINTS': ()})
+    with app.app_context():
+        report = bulk_insert(
+            args.kind, READERS[fmt](args.path), chunk_size=args.chunk_size,
+            defaults={'created_by': args.created_by},
+        )
+
+    print(f"[OK] {report['inserted']} of {report['received']} {args.kind} loaded")
+    if report['failed']:
+        print(f"[WARN] {report['failed']} rows rejected", file=sys.stderr)
+        for error in report['errors'][:20]:
+            print(f"   - row {error['index']}: {'; '.join(error['errors'])}", file=sys.stderr)
+        if len(report['errors']) > 20 and not args.errors:
+            print('   ... pass --errors to save the full list', file=sys.stderr)
+    if args.errors:
+        with open(args.errors, 'w', encoding='utf-8') as f:
+            json.dump(report['errors'], f, indent=2)
+    return 1 if report['failed'] and not report['inserted'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+Response compression with a cache of precompressed bodies.
+
+Responses above ``COMPRESS_MIN_SIZE`` bytes are compressed with brotli (when
+the ``brotli`` package is installed) or gzip, whichever the client prefers
+in ``Accept-Encoding``.  A body built by a view under ``etags.conditional``
+is immutable for its ETag, which is derived from the versions of the tables
+it reads, so its compressed form is kept in ``precompressed``, keyed by
+(ETag, encoding); the next request for the same version is answered from it
+without running the view, and compression CPU is paid once per version
+rather than once per request.  Views that cache data of their own must key
+it by the same versions (``etags.table_version``), or a stale body would be
+stored under a new ETag.
+
+Each encoding gets its own ETag (``"<etag>-gzip"``, ``"<etag>-br"``) as
+strong validators must differ between representations.
+"""
+
+import gzip
+
+from flask import current_app, g, request
+
+from result_cache import ResultCache
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional, gzip still works
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = frozenset({
+    'application/json', 'application/javascript', 'text/css', 'text/html', 'text/plain',
+})
+ENCODINGS = ('br', 'gzip')
+
+# Entries never go stale (a write changes the ETag); the TTL only returns
+# memory held by versions nobody asks for any more.
+precompressed = ResultCache(max_entries=128, ttl_seconds=3600)
+
+
+def available_encodings():
+    return [encoding for encoding in ENCODINGS if encoding != 'br' or brotli is not None]
+
+
+def negotiate_encoding():
+    """The best encoding the client accepts, or None for identity."""
+    return request.accept_encodings.best_match(available_encodings())
+
+
+def encoded_etag(etag, encoding):
+    return f'{etag}-{encoding}'
+
+
+def etag_variants(etag):
+    """The ETag of every representation of a response: identity and each encoding."""
+    return [etag] + [encoded_etag(etag, encoding) for encoding in ENCODINGS]
+
+
+def compress(data, encoding):
+    config = current_app.config
+    if encoding == 'br':
+        return brotli.compress(data, quality=config['COMPRESS_BROTLI_QUALITY'])
+    # mtime=0 keeps the bytes identical across workers, as a strong ETag promises.
+    return gzip.compress(data, compresslevel=config['COMPRESS_GZIP_LEVEL'], mtime=0)
+
+
+def _encoded_response(etag, encoding, body, mimetype):
+    response = current_app.response_class(body, mimetype=mimetype)
+    response.headers['Content-Encoding'] = encoding
+    response.set_etag(encoded_etag(etag, encoding))
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def precompressed_response(etag):
+    """Serve the cached compressed body for ``etag``, or None on a miss."""
+    encoding = negotiate_encoding()
+    if encoding is None:
+        return None
+    entry = precompressed.get((etag, encoding))
+    if entry is None:
+        return None
+    body, mimetype = entry
+    return _encoded_response(etag, encoding, body, mimetype)
+
+
+def compress_response(response):
+    """``after_request`` hook compressing eligible responses."""
+    if (
+        response.status_code != 200
+        or response.direct_passthrough
+        or response.is_streamed
+        or 'Content-Encoding' in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        or request.method == 'HEAD'
+    ):
+        return response
+    response.vary.add('Accept-Encoding')
+
+    data = response.get_data()
+    encoding = negotiate_encoding()
+    if encoding is None or len(data) < current_app.config['COMPRESS_MIN_SIZE']:
+        return response
+
+    body = compress(data, encoding)
+    etag, weak = response.get_etag()
+    # Only bodies conditional built for this ETag; other strong ETags carry no version.
+    if etag and not weak and etag == g.get('versioned_etag'):
+        precompressed.set((etag, encoding), (body, response.mimetype))
+        response.set_etag(encoded_etag(etag, encoding))
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def init_compression(app):
+    app.config.setdefault('COMPRESS_MIN_SIZE', 1024)
+    app.config.setdefault('COMPRESS_GZIP_LEVEL', 6)
+    app.config.setdefault('COMPRESS_BROTLI_QUALITY', 5)
+    app.after_request(compress_response)
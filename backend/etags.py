@@ -0,0 +1,90 @@
+"""
+Conditional GET support for rarely-changing listings.
+
+``@conditional('stays')`` derives a strong ETag from the current version of
+the named tables (see ``TableVersion``) and the request: path, query
+arguments except the frontend's ``_t`` cache buster, and the negotiated
+format.  A matching ``If-None-Match`` (for any encoding of the response) is
+answered with ``304`` after a single primary-key lookup, before the view
+queries or serializes anything; a cached compressed body for the ETag is
+likewise served without running the view.
+
+The version is read before the view runs, so a write racing a request can
+at worst pair a newer body with an older ETag; the next request then gets a
+full response again, never a stale one.
+"""
+
+import hashlib
+from functools import wraps
+
+from flask import current_app, g, request
+
+from compression import etag_variants, precompressed_response
+from models import TableVersion, db
+from streaming import wants_ndjson
+
+IGNORED_ARGS = frozenset({'_t'})
+
+
+def table_versions(*table_names):
+    """Current write version of each table (0 before its first write)."""
+    rows = db.session.query(TableVersion.table_name, TableVersion.version).filter(
+        TableVersion.table_name.in_(table_names)
+    )
+    versions = dict.fromkeys(table_names, 0)
+    versions.update(rows)
+    return versions
+
+
+def table_version(table_name):
+    """The version ``conditional`` read for this request, else the current one.
+
+    Views key in-process caches by it, so a write from any process (another
+    worker, bulk_loader.py, seed_data.py) misses the old entries.
+    """
+    versions = g.get('table_versions', {})
+    if table_name not in versions:
+        return table_versions(table_name)[table_name]
+    return versions[table_name]
+
+
+def request_etag(*parts):
+    """Strong ETag for the current request, scoped by ``parts`` (versions etc.)."""
+    args = sorted((key, value) for key, value in request.args.items(multi=True) if key not in IGNORED_ARGS)
+    key = repr((request.path, args, wants_ndjson(), parts))
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def conditional(*table_names, static_version=None, unless=None):
+    """
+    Decorate a GET view with ETag / ``If-None-Match`` handling.
+
+    ``table_names`` are the tables the response is built from;
+    ``static_version`` identifies responses built from constants instead.
+    Requests for which ``unless()`` is true (e.g. random picks) bypass it.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if unless is not None and unless():
+                return view(*args, **kwargs)
+            versions = table_versions(*table_names) if table_names else {}
+            g.table_versions = versions
+            etag = request_etag(sorted(versions.items()), static_version)
+            matched = next((tag for tag in etag_variants(etag) if request.if_none_match.contains(tag)), None)
+            if matched is not None:
+                response = current_app.response_class(status=304)
+                response.set_etag(matched)
+            else:
+                response = precompressed_response(etag)
+                if response is None:
+                    response = current_app.make_response(view(*args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+                    response.set_etag(etag)
+                    g.versioned_etag = etag
+            response.headers['Cache-Control'] = 'no-cache'
+            response.vary.add('Accept')
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,172 @@
+"""
+Geographic helpers shared by the location-aware routes.
+
+Rows with coordinates carry a ``geocell`` column: the id of the fixed
+lat/lon grid cell the point falls in.  Cells are numbered row-major, so
+every latitude band of a search box maps to one contiguous id range and a
+radius query becomes a handful of indexed ``BETWEEN`` scans.  The reverse
+lookup (which stored circles contain a point?) indexes each circle by the
+cells it covers at one of a few grid levels.
+
+Distances for whole candidate sets are computed in one NumPy pass with
+``haversine_km``; ``calculate_distance`` remains for single pairs.
+"""
+
+import math
+
+import numpy as np
+from sqlalchemy import and_, or_
+
+EARTH_RADIUS_KM = 6371
+GEOCELL_SIZE_DEG = 0.1  # ~11 km at the equator
+# Progressively coarser grids for indexing circles of any size; level 0 is
+# the grid used by the ``geocell`` columns.
+GEOCELL_LEVELS = (GEOCELL_SIZE_DEG, 1.0, 10.0)
+MAX_CELLS_PER_CIRCLE = 16
+
+# Widen search boxes slightly so float rounding never drops a point that
+# sits exactly on the radius.
+_BOX_PADDING_DEG = 1e-6
+
+
+def calculate_distance(lat1, lon1, lat2, lon2):
+    """Calculate distance between two coordinates in kilometers"""
+    dlat = math.radians(lat2 - lat1)
+    dlon = math.radians(lon2 - lon1)
+    a = math.sin(dlat/2)**2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon/2)**2
+    c = 2 * math.asin(math.sqrt(a))
+    return EARTH_RADIUS_KM * c
+
+
+def haversine_km(lat, lon, lats, lons):
+    """Great-circle distances in km from one point to arrays of points."""
+    lat1 = np.radians(lat)
+    lat2 = np.radians(np.asarray(lats, dtype=float))
+    dlat = lat2 - lat1
+    dlon = np.radians(np.asarray(lons, dtype=float) - lon)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def equirectangular_km(lat, lon, lats, lons):
+    """
+    Fast flat-earth approximation of ``haversine_km`` for short distances.
+
+    The absolute error grows with the cube of the distance: up to 50 km from
+    points with |latitude| <= 70 it stays below 2 m (relative error < 3e-5),
+    and below 10 m up to 100 km.  Do not use it for ranking across cities.
+    """
+    lats = np.asarray(lats, dtype=float)
+    dlon = (np.asarray(lons, dtype=float) - lon + 180) % 360 - 180
+    x = np.radians(dlon) * np.cos(np.radians((lats + lat) / 2))
+    y = np.radians(lats - lat)
+    return EARTH_RADIUS_KM * np.hypot(x, y)
+
+
+def _grid_shape(size_deg):
+    return int(round(180 / size_deg)), int(round(360 / size_deg))
+
+
+def _cell_row(lat, size_deg=GEOCELL_SIZE_DEG):
+    rows, _ = _grid_shape(size_deg)
+    row = int((lat + 90) // size_deg)
+    return min(max(row, 0), rows - 1)
+
+
+def _cell_col(lon, size_deg=GEOCELL_SIZE_DEG):
+    _, cols = _grid_shape(size_deg)
+    return int(((lon + 180) % 360) // size_deg) % cols
+
+
+def geocell(lat, lon, size_deg=GEOCELL_SIZE_DEG):
+    """Return the grid cell id for a coordinate, or None if it is incomplete."""
+    if lat is None or lon is None:
+        return None
+    _, cols = _grid_shape(size_deg)
+    return _cell_row(lat, size_deg) * cols + _cell_col(lon, size_deg)
+
+
+def bounding_box(lat, lon, radius_km):
+    """
+    Return (min_lat, max_lat, min_lon, max_lon) enclosing a radius.
+
+    Longitudes may fall outside [-180, 180) when the box crosses the
+    antimeridian; a box touching a pole spans every longitude.
+    """
+    angular = radius_km / EARTH_RADIUS_KM
+    dlat = math.degrees(angular) + _BOX_PADDING_DEG
+    min_lat, max_lat = lat - dlat, lat + dlat
+
+    if min_lat <= -90 or max_lat >= 90 or angular >= math.pi / 2:
+        return max(min_lat, -90), min(max_lat, 90), -180, 180
+
+    dlon = math.degrees(math.asin(min(1.0, math.sin(angular) / math.cos(math.radians(lat)))))
+    dlon += _BOX_PADDING_DEG
+    return min_lat, max_lat, lon - dlon, lon + dlon
+
+
+def _col_ranges(min_lon, max_lon, size_deg):
+    _, cols = _grid_shape(size_deg)
+    if max_lon - min_lon >= 360 - size_deg:
+        return [(0, cols - 1)]
+    first, last = _cell_col(min_lon, size_deg), _cell_col(max_lon, size_deg)
+    if first <= last:
+        return [(first, last)]
+    # Box crosses the antimeridian.
+    return [(0, last), (first, cols - 1)]
+
+
+def geocell_ranges(lat, lon, radius_km, size_deg=GEOCELL_SIZE_DEG):
+    """Return merged (low, high) geocell id ranges covering a radius."""
+    min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_km)
+    _, cols = _grid_shape(size_deg)
+    col_ranges = _col_ranges(min_lon, max_lon, size_deg)
+
+    ranges = []
+    for row in range(_cell_row(min_lat, size_deg), _cell_row(max_lat, size_deg) + 1):
+        base = row * cols
+        for first, last in col_ranges:
+            low, high = base + first, base + last
+            if ranges and ranges[-1][1] + 1 >= low:
+                ranges[-1] = (ranges[-1][0], max(ranges[-1][1], high))
+            else:
+                ranges.append((low, high))
+    return ranges
+
+
+def circle_cells(lat, lon, radius_km):
+    """
+    Return (level, cell ids) covering a circle, for reverse-radius lookups.
+
+    The finest level of ``GEOCELL_LEVELS`` whose covering needs at most
+    ``MAX_CELLS_PER_CIRCLE`` cells is used, so large circles are stored as a
+    few coarse cells instead of thousands of fine ones.
+    """
+    for level, size_deg in enumerate(GEOCELL_LEVELS):
+        ranges = geocell_ranges(lat, lon, radius_km, size_deg)
+        count = sum(high - low + 1 for low, high in ranges)
+        if count <= MAX_CELLS_PER_CIRCLE or level == len(GEOCELL_LEVELS) - 1:
+            return level, [cell for low, high in ranges for cell in range(low, high + 1)]
+
+
+def point_cells(lat, lon):
+    """Return the (level, cell id) containing a point at every grid level."""
+    return [(level, geocell(lat, lon, size_deg)) for level, size_deg in enumerate(GEOCELL_LEVELS)]
+
+
+def geocell_filter(column, lat, lon, radius_km):
+    """SQL clause restricting ``column`` to the cells around a radius."""
+    return or_(*[column.between(low, high) for low, high in geocell_ranges(lat, lon, radius_km)])
+
+
+def bounding_box_filter(lat_column, lon_column, lat, lon, radius_km):
+    """SQL clause restricting coordinate columns to the box around a radius."""
+    min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_km)
+    clause = lat_column.between(min_lat, max_lat)
+    if max_lon - min_lon >= 360:
+        return clause
+    if min_lon < -180:
+        return and_(clause, or_(lon_column >= min_lon + 360, lon_column <= max_lon))
+    if max_lon >= 180:
+        return and_(clause, or_(lon_column >= min_lon, lon_column <= max_lon - 360))
+    return and_(clause, lon_column.between(min_lon, max_lon))
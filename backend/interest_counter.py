@@ -0,0 +1,111 @@
+"""
+Write-behind counter for event interest marks.
+
+Clicks are buffered in memory and flushed as one batched
+``UPDATE events SET interested_count = interested_count + ?`` every
+``INTEREST_FLUSH_INTERVAL_MS`` or as soon as ``INTEREST_FLUSH_MAX_PENDING``
+marks are waiting, so a click storm costs one short write transaction
+instead of one per click.  Marks still buffered when a worker is killed
+are lost; a normal shutdown flushes them.
+
+Each app gets its own counter in ``app.extensions['interest_counter']``, so
+apps on different databases never share a buffer.  The flusher thread starts
+with the first mark, so apps that never count one (scripts, benchmarks) run
+no thread.
+"""
+
+import atexit
+import threading
+from collections import defaultdict
+
+from flask import current_app
+from sqlalchemy import bindparam, func
+
+from models import db, Event
+
+
+class InterestCounter:
+    """Buffers one app's interest increments per event and flushes them in batches."""
+
+    def __init__(self, app):
+        app.config.setdefault('INTEREST_FLUSH_INTERVAL_MS', 250)
+        app.config.setdefault('INTEREST_FLUSH_MAX_PENDING', 100)
+        self.flush_interval = app.config['INTEREST_FLUSH_INTERVAL_MS'] / 1000
+        self.max_pending = app.config['INTEREST_FLUSH_MAX_PENDING']
+        self._app = app
+        self._pending = defaultdict(int)
+        self._pending_total = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def _start(self):
+        # Called with ``_lock`` held.
+        self._thread = threading.Thread(target=self._run, name='interest-flusher', daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def increment(self, event_id, amount=1):
+        """Buffer ``amount`` marks for an event; returns its unflushed total."""
+        with self._lock:
+            if self._thread is None:
+                self._start()
+            self._pending[event_id] += amount
+            self._pending_total += amount
+            pending = self._pending[event_id]
+            full = self._pending_total >= self.max_pending
+        if full:
+            self._wakeup.set()
+        return pending
+
+    def pending(self, event_id):
+        """Marks buffered for an event that are not in the database yet."""
+        with self._lock:
+            return self._pending.get(event_id, 0)
+
+    def flush(self):
+        """Write all buffered marks in one transaction; returns events updated."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, defaultdict(int)
+                self._pending_total = 0
+            if not batch:
+                return 0
+
+            table = Event.__table__
+            stmt = (
+                table.update()
+                .where(table.c.id == bindparam('event_id'))
+                .values(interested_count=func.coalesce(table.c.interested_count, 0) + bindparam('delta'))
+            )
+            rows = [{'event_id': event_id, 'delta': delta} for event_id, delta in batch.items()]
+            try:
+                with self._app.app_context():
+                    db.session.execute(stmt, rows)
+                    db.session.commit()
+            except Exception as exc:
+                # Keep the marks for the next attempt rather than dropping them.
+                with self._lock:
+                    for event_id, delta in batch.items():
+                        self._pending[event_id] += delta
+                        self._pending_total += delta
+                self._app.logger.warning("Interest flush failed, will retry: %s", exc)
+                return 0
+            return len(rows)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+
+def init_interest_counter(app):
+    """Give ``app`` its own interest counter."""
+    app.extensions['interest_counter'] = InterestCounter(app)
+
+
+def current_interest_counter():
+    """The interest counter of the app handling the current request."""
+    return current_app.extensions['interest_counter']
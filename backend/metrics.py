@@ -0,0 +1,209 @@
+"""
+In-process request and outbound-call metrics in Prometheus text format.
+
+``init_metrics(app)`` times every request and records, per route template
+(``/api/stays/<int:stay_id>``, not the raw path, so label cardinality stays
+bounded) and method: a latency histogram, status-code counts and a response
+size histogram, plus a gauge of requests in flight.  ``outbound_call`` times
+calls to the AI, translation and geocoding backends.  ``/api/metrics``
+(``routes/metrics_routes.py``) renders it all for a Prometheus scrape.
+
+Recording is a bisect and a few dict updates under one lock.  Each worker
+process keeps its own registry; scrape every worker or sum across them.
+Latency is measured until the response object is ready, so a streamed
+body's transfer time is not included.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from flask import g, request
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+OUTBOUND_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{value}"' for name, value in extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Metric:
+    """Base for a labelled metric family; values live in ``self._values``."""
+
+    kind = None
+
+    def __init__(self, registry, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = registry.lock
+        self._values = {}
+        registry.register(self)
+
+    def header(self):
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        return [f'{self.name}{_labels(self.labelnames, key)} {_format_value(value)}'
+                for key, value in sorted(self._values.items())]
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value, *labels):
+        with self._lock:
+            self._values[labels] = value
+
+    def samples(self):
+        values = self._values or ({(): 0} if not self.labelnames else {})
+        return [f'{self.name}{_labels(self.labelnames, key)} {_format_value(value)}'
+                for key, value in sorted(values.items())]
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, registry, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                # Per-bucket counts (last slot is +Inf), then sum.
+                series = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def samples(self):
+        lines = []
+        for key, (counts, total) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = (('le', _format_value(float(bound))),)
+                lines.append(f'{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_labels(self.labelnames, key)} {_format_value(total)}')
+            lines.append(f'{self.name}_count{_labels(self.labelnames, key)} {cumulative}')
+        return lines
+
+
+class MetricsRegistry:
+    """Holds the metric families and renders the exposition text."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+
+    def render(self):
+        lines = []
+        with self.lock:
+            for metric in self._metrics:
+                lines.extend(metric.header())
+                lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+process_start_time = Gauge(registry, 'process_start_time_seconds', 'Start time of the process since the epoch.')
+process_start_time.set(time.time())
+requests_total = Counter(registry, 'http_requests_total', 'HTTP requests by route, method and status.',
+                         ('method', 'endpoint', 'status'))
+request_duration = Histogram(registry, 'http_request_duration_seconds', 'Time to produce a response.',
+                             ('method', 'endpoint'))
+response_size = Histogram(registry, 'http_response_size_bytes', 'Response body size (after compression).',
+                          ('method', 'endpoint'), buckets=SIZE_BUCKETS)
+requests_in_flight = Gauge(registry, 'http_requests_in_flight', 'Requests currently being handled.')
+outbound_duration = Histogram(registry, 'outbound_request_duration_seconds',
+                              'Latency of calls to external backends (AI, translation, geocoding).',
+                              ('backend', 'outcome'), buckets=OUTBOUND_BUCKETS)
+
+
+@contextmanager
+def outbound_call(backend):
+    """Time the block as one call to ``backend``; outcome is 'error' if it raises."""
+    started = time.perf_counter()
+    outcome = 'error'
+    try:
+        yield
+        outcome = 'ok'
+    finally:
+        outbound_duration.observe(time.perf_counter() - started, backend, outcome)
+
+
+def _endpoint():
+    rule = request.url_rule
+    return rule.rule if rule is not None else '<unmatched>'
+
+
+def _start_timer():
+    g._metrics_started = time.perf_counter()
+    g._metrics_in_flight = True
+    requests_in_flight.inc()
+
+
+def _record_response(response):
+    started = g.pop('_metrics_started', None)
+    if started is None:
+        return response
+    method, endpoint = request.method, _endpoint()
+    request_duration.observe(time.perf_counter() - started, method, endpoint)
+    requests_total.inc(method, endpoint, str(response.status_code))
+    if response.content_length is not None:
+        response_size.observe(response.content_length, method, endpoint)
+    return response
+
+
+def _finish_request(exc=None):
+    if g.pop('_metrics_in_flight', False):
+        requests_in_flight.dec()
+
+
+def init_metrics(app):
+    """Install the timing hooks; call before other ``after_request`` hooks
+    (e.g. ``init_compression``) so sizes are measured on the final body."""
+    app.before_request(_start_timer)
+    # after_request hooks run in reverse order of registration.
+    app.after_request(_record_response)
+    app.teardown_request(_finish_request)
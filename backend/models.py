@@ -1,10 +1,19 @@
 from flask_sqlalchemy import SQLAlchemy
-from datetime import datetime
+from sqlalchemy import DDL, event
+from datetime import datetime, timezone
+
+import geo
 
 db = SQLAlchemy()
 
 class Stay(db.Model):
     __tablename__ = 'stays'
+    __table_args__ = (
+        db.Index('ix_stays_geocell_lat_lon', 'geocell', 'latitude', 'longitude'),
+        db.Index('ix_stays_lat_lon', 'latitude', 'longitude'),
+        db.Index('ix_stays_price_rating', 'price_per_night', 'rating'),
+        db.Index('ix_stays_rating_price', 'rating', 'price_per_night'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(200), nullable=False)
     address = db.Column(db.String(500))
@@ -15,6 +24,7 @@ class Stay(db.Model):
     description = db.Column(db.Text)
     amenities = db.Column(db.String(500))
     contact = db.Column(db.String(100))
+    geocell = db.Column(db.Integer)  # Grid cell id, kept in sync with latitude/longitude
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     def to_dict(self):
@@ -31,8 +41,17 @@ class Stay(db.Model):
             'contact': self.contact
         }
 
+@event.listens_for(Stay, 'before_insert')
+@event.listens_for(Stay, 'before_update')
+def _sync_stay_geocell(mapper, connection, stay):
+    stay.geocell = geo.geocell(stay.latitude, stay.longitude)
+
 class TouristSpot(db.Model):
     __tablename__ = 'tourist_spots'
+    __table_args__ = (
+        db.Index('ix_tourist_spots_geocell_lat_lon', 'geocell', 'latitude', 'longitude'),
+        db.Index('ix_tourist_spots_category', 'category'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(200), nullable=False)
     latitude = db.Column(db.Float, nullable=False)
@@ -41,6 +60,8 @@ class TouristSpot(db.Model):
     category = db.Column(db.String(100))
     image_url = db.Column(db.String(500))
     rating = db.Column(db.Float)
+    rating_score = db.Column(db.Float)  # Distance-independent part of the recommendation score
+    geocell = db.Column(db.Integer)  # Grid cell id, kept in sync with latitude/longitude
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     def to_dict(self):
@@ -55,8 +76,21 @@ class TouristSpot(db.Model):
             'rating': self.rating
         }
 
+def spot_rating_score(rating):
+    """Rating component of a spot's recommendation score (0 - 0.65)."""
+    return ((rating or 0) / 5) * 0.65
+
+@event.listens_for(TouristSpot, 'before_insert')
+@event.listens_for(TouristSpot, 'before_update')
+def _sync_spot_derived_columns(mapper, connection, spot):
+    spot.rating_score = spot_rating_score(spot.rating)
+    spot.geocell = geo.geocell(spot.latitude, spot.longitude)
+
 class Event(db.Model):
     __tablename__ = 'events'
+    __table_args__ = (
+        db.Index('ix_events_date_id', 'date', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text)
@@ -80,17 +114,157 @@ class Event(db.Model):
             'location': self.location,
             'latitude': self.latitude,
             'longitude': self.longitude,
-            'date': self.date.isoformat() if self.date else None,
+            'date': self.date,
             'contact': self.contact,
             'tags': self.tags,
             'organizer': self.organizer,
             'interested_count': self.interested_count,
             'visibility_radius_km': self.visibility_radius_km,
             'created_by': self.created_by,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at
         }
 
 
+def parse_event_datetime(value):
+    """Parse an ISO 8601 string into the naive UTC datetime stored on events.
+
+    Offsets (including a trailing ``Z``) are converted to UTC so events
+    submitted from different timezones sort correctly; naive values are taken
+    as UTC already.  Raises ValueError for malformed input.
+    """
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+class EventCell(db.Model):
+    """Grid cells covered by an event's visibility circle (reverse-radius index)."""
+    __tablename__ = 'event_cells'
+    level = db.Column(db.Integer, primary_key=True)
+    cell = db.Column(db.Integer, primary_key=True)
+    event_id = db.Column(db.Integer, db.ForeignKey('events.id'), primary_key=True, index=True)
+
+
+def event_cells_covering(lat, lon):
+    """SQL clause matching EventCell rows whose circle cell contains a point."""
+    return db.or_(*[
+        db.and_(EventCell.level == level, EventCell.cell == cell)
+        for level, cell in geo.point_cells(lat, lon)
+    ])
+
+
+def event_cell_rows(event_id, latitude, longitude, visibility_radius_km):
+    """Rows indexing an event's visibility circle; none for events without a location."""
+    if not (latitude and longitude):
+        return []
+    level, cells = geo.circle_cells(latitude, longitude, visibility_radius_km or 10.0)
+    return [{'level': level, 'cell': cell, 'event_id': event_id} for cell in cells]
+
+
+class EventTag(db.Model):
+    """One normalized tag of an event (inverted index over Event.tags)."""
+    __tablename__ = 'event_tags'
+    tag = db.Column(db.String(100), primary_key=True)
+    event_id = db.Column(db.Integer, db.ForeignKey('events.id'), primary_key=True, index=True)
+
+
+def normalize_tags(raw):
+    """Split a comma-separated tag string into unique lowercase tags, in order."""
+    tags = []
+    for tag in (raw or '').split(','):
+        tag = tag.strip().lower()[:100]
+        if tag and tag not in tags:
+            tags.append(tag)
+    return tags
+
+
+def event_tag_rows(event_id, tags):
+    """Rows indexing an event's tags."""
+    return [{'tag': tag, 'event_id': event_id} for tag in normalize_tags(tags)]
+
+
+def _write_event_index(connection, table, evt, rows):
+    connection.execute(table.delete().where(table.c.event_id == evt.id))
+    if rows:
+        connection.execute(table.insert(), rows)
+
+
+def _write_event_cells(connection, evt):
+    rows = event_cell_rows(evt.id, evt.latitude, evt.longitude, evt.visibility_radius_km)
+    _write_event_index(connection, EventCell.__table__, evt, rows)
+
+
+def _write_event_tags(connection, evt):
+    _write_event_index(connection, EventTag.__table__, evt, event_tag_rows(evt.id, evt.tags))
+
+
+@event.listens_for(Event, 'after_insert')
+def _index_new_event(mapper, connection, evt):
+    _write_event_cells(connection, evt)
+    _write_event_tags(connection, evt)
+
+
+@event.listens_for(Event, 'after_update')
+def _reindex_changed_event(mapper, connection, evt):
+    state = db.inspect(evt)
+    if any(state.attrs[name].history.has_changes()
+           for name in ('latitude', 'longitude', 'visibility_radius_km')):
+        _write_event_cells(connection, evt)
+    if state.attrs.tags.history.has_changes():
+        _write_event_tags(connection, evt)
+
+
+@event.listens_for(Event, 'after_delete')
+def _delete_event_index(mapper, connection, evt):
+    for table in (EventCell.__table__, EventTag.__table__):
+        connection.execute(table.delete().where(table.c.event_id == evt.id))
+
+
+INDEX_BACKFILL_CHUNK = 5000
+
+
+def _unindexed_events(connection, table, *columns, where=None):
+    """(id, *columns) of events with no rows in the index ``table``."""
+    events = Event.__table__
+    query = (
+        db.select(events.c.id, *(events.c[name] for name in columns))
+        .where(~db.exists().where(table.c.event_id == events.c.id))
+    )
+    if where is not None:
+        query = query.where(where)
+    return connection.execute(query).all()
+
+
+def _backfill_event_index(connection, table, events, make_rows):
+    rows = []
+    for evt in events:
+        rows.extend(make_rows(*evt))
+        if len(rows) >= INDEX_BACKFILL_CHUNK:
+            connection.execute(table.insert(), rows)
+            rows = []
+    if rows:
+        connection.execute(table.insert(), rows)
+
+
+@event.listens_for(db.metadata, 'after_create')
+def _backfill_event_cells(target, connection, **kw):
+    # Events stored before event_cells existed are indexed on the next
+    # create_all(); indexed events are skipped, so this is a no-op after that.
+    table = EventCell.__table__
+    events = _unindexed_events(connection, table, 'latitude', 'longitude', 'visibility_radius_km')
+    _backfill_event_index(connection, table, events, event_cell_rows)
+
+
+@event.listens_for(db.metadata, 'after_create')
+def _backfill_event_tags(target, connection, **kw):
+    # Same for event_tags, from the comma-separated Event.tags.
+    table = EventTag.__table__
+    tags = Event.__table__.c.tags
+    events = _unindexed_events(connection, table, 'tags', where=db.and_(tags.isnot(None), tags != ''))
+    _backfill_event_index(connection, table, events, event_tag_rows)
+
+
 class Friend(db.Model):
     __tablename__ = 'friends'
     id = db.Column(db.Integer, primary_key=True)
@@ -114,12 +288,15 @@ class Friend(db.Model):
             'status': self.status,
             'favorite_place': self.favorite_place,
             'home_city': self.home_city,
-            'last_checked_in': self.last_checked_in.isoformat() if self.last_checked_in else None,
+            'last_checked_in': self.last_checked_in,
             'is_online': self.is_online,
         }
 
 class EventComment(db.Model):
     __tablename__ = 'event_comments'
+    __table_args__ = (
+        db.Index('ix_event_comments_event_created', 'event_id', 'created_at', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     event_id = db.Column(db.Integer, db.ForeignKey('events.id'), nullable=False)
     author = db.Column(db.String(100))
@@ -134,6 +311,147 @@ class EventComment(db.Model):
             'event_id': self.event_id,
             'author': self.author,
             'comment': self.comment,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at
         }
 
+
+
+# Full-text search: external-content FTS5 tables over the searchable columns,
+# kept in sync by triggers so ORM writes and Core bulk inserts are both indexed.
+FULLTEXT_COLUMNS = {
+    'stays': ('name', 'description', 'amenities'),
+    'tourist_spots': ('name', 'description', 'category'),
+    'events': ('title', 'description', 'tags'),
+}
+
+
+def fulltext_table(table_name):
+    """Name of the FTS5 table indexing ``table_name``."""
+    return f'{table_name}_fts'
+
+
+def _fulltext_ddl(table_name, columns):
+    fts = fulltext_table(table_name)
+    cols = ', '.join(columns)
+    new_values = ', '.join(f'new.{c}' for c in columns)
+    old_values = ', '.join(f'old.{c}' for c in columns)
+    remove = f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_values});"
+    add = f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_values});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, content='{table_name}', "
+        f"content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table_name} BEGIN {add} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table_name} BEGIN {remove} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {table_name} BEGIN {remove} {add} END",
+    ]
+
+
+def _table_exists(connection, name):
+    return db.inspect(connection).has_table(name)
+
+
+@event.listens_for(db.metadata, 'after_create')
+def _create_fulltext_indexes(target, connection, **kw):
+    # On the metadata rather than each table, so databases whose tables
+    # predate full-text search get the index too; rows already in the table
+    # are indexed by a rebuild when the FTS table is first created.
+    if connection.dialect.name != 'sqlite':
+        return
+    for table_name, columns in FULLTEXT_COLUMNS.items():
+        fts = fulltext_table(table_name)
+        created = not _table_exists(connection, fts)
+        for statement in _fulltext_ddl(table_name, columns):
+            connection.exec_driver_sql(statement)
+        if created:
+            connection.exec_driver_sql(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+for _table_name in FULLTEXT_COLUMNS:
+    event.listen(
+        db.metadata.tables[_table_name], 'before_drop',
+        DDL(f'DROP TABLE IF EXISTS {fulltext_table(_table_name)}').execute_if(dialect='sqlite'),
+    )
+
+
+class TableVersion(db.Model):
+    """Write counter per table, used to build ETags for conditional GETs."""
+    __tablename__ = 'table_versions'
+    table_name = db.Column(db.String(100), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+
+# Tables whose version is bumped by triggers on every row written, so ORM
+# writes, Core bulk inserts and manual edits all invalidate cached responses.
+VERSIONED_TABLES = ('stays', 'tourist_spots')
+
+
+def _version_trigger_ddl(table_name):
+    bump = (
+        f"INSERT INTO table_versions (table_name, version) VALUES ('{table_name}', 1) "
+        "ON CONFLICT (table_name) DO UPDATE SET version = version + 1;"
+    )
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {table_name}_version_{suffix} AFTER {operation} ON {table_name} "
+        f"BEGIN {bump} END"
+        for suffix, operation in (('ai', 'INSERT'), ('au', 'UPDATE'), ('ad', 'DELETE'))
+    ]
+
+
+# Registered on the metadata rather than the tables so the triggers are also
+# added to databases whose tables predate them.
+for _table_name in VERSIONED_TABLES:
+    for _statement in _version_trigger_ddl(_table_name):
+        event.listen(db.metadata, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+
+
+# Derived columns added after the first release.  create_all() never alters
+# existing tables, so older databases get the columns here, and rows that
+# predate them are filled in.
+DERIVED_COLUMNS = {
+    'stays': (('geocell',), lambda row: {'geocell': geo.geocell(row.latitude, row.longitude)}),
+    'tourist_spots': (('geocell', 'rating_score'), lambda row: {
+        'geocell': geo.geocell(row.latitude, row.longitude),
+        'rating_score': spot_rating_score(row.rating),
+    }),
+}
+DERIVED_BACKFILL_CHUNK = 5000
+
+
+def _add_missing_columns(connection, table, names):
+    existing = {column['name'] for column in db.inspect(connection).get_columns(table.name)}
+    for name in names:
+        if name not in existing:
+            column_type = table.c[name].type.compile(dialect=connection.dialect)
+            connection.exec_driver_sql(f'ALTER TABLE {table.name} ADD COLUMN {name} {column_type}')
+
+
+def _create_missing_indexes(connection):
+    # Like the columns, indexes declared after a table was first created are
+    # only built by create_all() for new tables.
+    for table in db.metadata.sorted_tables:
+        if _table_exists(connection, table.name):
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+
+
+def _backfill_derived_columns(connection, table, names, derive):
+    rows = connection.execute(
+        db.select(table).where(db.or_(*(table.c[name].is_(None) for name in names)))
+    ).all()
+    update = (
+        table.update()
+        .where(table.c.id == db.bindparam('row_id'))
+        .values({name: db.bindparam(name) for name in names})
+    )
+    for start in range(0, len(rows), DERIVED_BACKFILL_CHUNK):
+        chunk = rows[start:start + DERIVED_BACKFILL_CHUNK]
+        connection.execute(update, [dict(derive(row), row_id=row.id) for row in chunk])
+
+
+@event.listens_for(db.metadata, 'after_create')
+def _upgrade_schema(target, connection, **kw):
+    for table_name, (names, _) in DERIVED_COLUMNS.items():
+        _add_missing_columns(connection, db.metadata.tables[table_name], names)
+    _create_missing_indexes(connection)
+    for table_name, (names, derive) in DERIVED_COLUMNS.items():
+        _backfill_derived_columns(connection, db.metadata.tables[table_name], names, derive)
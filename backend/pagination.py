@@ -0,0 +1,110 @@
+"""
+Keyset (cursor) pagination shared by the listing endpoints.
+
+A page is requested with ``limit`` and, after the first page, the opaque
+``cursor`` returned in the ``X-Next-Cursor`` response header.  Cursors encode
+the sort key of the last row served (e.g. ``[distance, id]`` or
+``[date, id]``), so rows inserted between requests never shift a page.
+"""
+
+import base64
+import binascii
+import heapq
+import json
+
+from flask import jsonify, request
+
+from geo import haversine_km
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+
+def encode_cursor(key):
+    """Encode a sort key as an opaque, URL-safe cursor string."""
+    raw = json.dumps(list(key), separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Decode a cursor produced by ``encode_cursor``; raises ValueError."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError):
+        raise ValueError('Invalid cursor')
+    if not isinstance(key, list) or not key:
+        raise ValueError('Invalid cursor')
+    return key
+
+
+def page_args(*key_types):
+    """
+    Read ``limit``/``cursor`` from the request.
+
+    ``key_types`` gives the expected type of each sort key component.
+    Returns ``(limit, after)``; ``limit`` is None when the caller did not ask
+    for pagination and ``after`` is None on the first page.  Raises
+    ValueError for malformed input.
+    """
+    limit = request.args.get('limit', type=int)
+    cursor = request.args.get('cursor')
+    if limit is None and cursor is None:
+        return None, None
+    if limit is None:
+        limit = DEFAULT_PAGE_SIZE
+    if limit < 1:
+        raise ValueError('limit must be a positive integer')
+    after = decode_cursor(cursor) if cursor else None
+    if after is not None and (
+        len(after) != len(key_types)
+        or not all(isinstance(value, key_type) for value, key_type in zip(after, key_types))
+    ):
+        raise ValueError('Invalid cursor')
+    return min(limit, MAX_PAGE_SIZE), after
+
+
+def page_response(items, next_key=None):
+    """JSON array response carrying the next cursor header when there is one."""
+    response = jsonify(items)
+    if next_key is not None:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(next_key)
+    return response
+
+
+def nearest_page(query, model, lat, lon, limit, after=None, max_distance=None, columns=None):
+    """
+    Return one page of ``query`` ordered by (distance, id) from a point.
+
+    Only ids and coordinates are read for the candidate set; full rows are
+    loaded for the page alone, as row tuples of ``columns`` (which must
+    include the id) when given.  Distances in the sort key are rounded to the
+    two decimals the API reports, matching the unpaginated ordering.
+    Returns ``([(row, distance)], next_key)``.
+    """
+    candidates = query.with_entities(model.id, model.latitude, model.longitude).all()
+    distances = haversine_km(lat, lon, [c[1] for c in candidates], [c[2] for c in candidates])
+
+    keys = []
+    for (row_id, _, _), distance in zip(candidates, distances.tolist()):
+        if max_distance is not None and distance > max_distance:
+            continue
+        key = (round(distance, 2), row_id)
+        if after is None or key > tuple(after):
+            keys.append(key)
+
+    page = heapq.nsmallest(limit + 1, keys)
+    next_key = page[limit - 1] if len(page) > limit else None
+    page = page[:limit]
+
+    page_query = model.query.filter(model.id.in_([key[1] for key in page]))
+    if columns is not None:
+        page_query = page_query.with_entities(*columns)
+    rows = {row.id: row for row in page_query}
+    return [(rows[row_id], distance) for distance, row_id in page if row_id in rows], next_key
+
+
+def invalid_page_args(exc):
+    """Standard 400 response for bad pagination parameters."""
+    return jsonify({'error': str(exc)}), 400
@@ -0,0 +1,76 @@
+"""
+Column projection for the list endpoints.
+
+Listings select only the columns a response needs and build dicts straight
+from the result tuples, so no ORM instances are hydrated or tracked in the
+identity map.  Clients can narrow a response with ``?fields=``, e.g.
+``fields=id,name,latitude,longitude,distance`` for map pins, and the
+unrequested columns (long ``description`` text included) are never read.
+Without ``fields`` the dicts match each model's ``to_dict()``.
+"""
+
+from flask import jsonify, request
+
+from models import Event, Friend, Stay, TouristSpot
+
+# Response fields of each model, in to_dict() order.
+API_FIELDS = {
+    Stay: ('id', 'name', 'address', 'latitude', 'longitude', 'price_per_night', 'rating',
+           'description', 'amenities', 'contact'),
+    TouristSpot: ('id', 'name', 'latitude', 'longitude', 'description', 'category', 'image_url', 'rating'),
+    Event: ('id', 'title', 'description', 'location', 'latitude', 'longitude', 'date', 'contact', 'tags',
+            'organizer', 'interested_count', 'visibility_radius_km', 'created_by', 'created_at'),
+    Friend: ('id', 'name', 'avatar_url', 'latitude', 'longitude', 'status', 'favorite_place', 'home_city',
+             'last_checked_in', 'is_online'),
+}
+
+
+def requested_fields(model, computed=()):
+    """
+    Fields asked for with ``?fields=``, or every field when it is absent.
+
+    ``computed`` names extra fields the endpoint adds itself, such as
+    ``distance``.  Raises ValueError for unknown names.
+    """
+    available = API_FIELDS[model] + tuple(computed)
+    raw = request.args.get('fields')
+    if raw is None:
+        return available
+    fields = tuple(dict.fromkeys(name.strip() for name in raw.split(',') if name.strip()))
+    unknown = [name for name in fields if name not in available]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    if not fields:
+        raise ValueError('fields must name at least one field')
+    return fields
+
+
+def projected_columns(model, fields, required=()):
+    """Columns to select for ``fields`` plus any ``required`` for filtering or sorting."""
+    names = [name for name in fields if name in API_FIELDS[model]]
+    names += [name for name in required if name not in names]
+    return [getattr(model, name) for name in names]
+
+
+def project(query, model, fields, required=()):
+    """Restrict ``query`` to the columns behind ``fields``; it then yields row tuples."""
+    return query.with_entities(*projected_columns(model, fields, required))
+
+
+def row_dict(row, fields, distance=None):
+    """Build the response dict for a projected row, adding ``distance`` when requested."""
+    values = row._mapping
+    item = {name: values[name] for name in fields if name in values}
+    if distance is not None and 'distance' in fields:
+        item['distance'] = distance
+    return item
+
+
+def narrow(item, fields):
+    """Keep only ``fields`` of an already-built response dict."""
+    return {name: item[name] for name in fields if name in item}
+
+
+def invalid_fields(exc):
+    """Standard 400 response for a bad ``fields`` parameter."""
+    return jsonify({'error': str(exc)}), 400
@@ -0,0 +1,147 @@
+"""
+Per-request SQL instrumentation.
+
+``init_query_stats(app)`` hooks the engine's cursor events to count the
+statements each request runs and the time spent in the database.  With
+``SQL_QUERY_HEADERS`` (follows debug mode unless set) every response
+carries ``X-DB-Query-Count`` and ``X-DB-Time-Ms``; statements a streamed
+body runs after the headers are sent are not in them.  Statements slower than
+``SQL_SLOW_QUERY_MS`` are logged for a ``SQL_SLOW_QUERY_SAMPLE_RATE``
+fraction of occurrences with their duration, endpoint and the *shape* of
+their parameters (types and row counts, never values).
+
+``max_queries(n)`` is the guard for tests and benchmarks::
+
+    with app.app_context(), max_queries(3):
+        client.get('/api/events?lat=13.34&lon=74.74')
+
+It fails with the offending statements listed when the block runs more.
+"""
+
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+from models import db
+
+STATEMENT_LOG_LIMIT = 500
+
+_local = threading.local()
+
+
+class QueryStats:
+    """Statements run and seconds spent in the database for one request."""
+
+    __slots__ = ('count', 'seconds')
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+def _parameter_shape(parameters, executemany):
+    if executemany:
+        rows = list(parameters) if parameters is not None else []
+        first = _parameter_shape(rows[0], False) if rows else None
+        return f'{len(rows)} x {first}'
+    if isinstance(parameters, dict):
+        return '{' + ', '.join(f'{key}: {type(value).__name__}' for key, value in parameters.items()) + '}'
+    if isinstance(parameters, (list, tuple)):
+        return '(' + ', '.join(type(value).__name__ for value in parameters) + ')'
+    return type(parameters).__name__
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_started'].pop()
+    elapsed = time.perf_counter() - started
+
+    for recorder in getattr(_local, 'recorders', ()):
+        recorder.append(statement)
+
+    if not has_request_context():
+        return
+    stats = g.get('_query_stats')
+    if stats is None:
+        return
+    stats.count += 1
+    stats.seconds += elapsed
+
+    config = current_app.config
+    if elapsed * 1000 >= config['SQL_SLOW_QUERY_MS'] and random.random() < config['SQL_SLOW_QUERY_SAMPLE_RATE']:
+        rule = request.url_rule
+        current_app.logger.warning(
+            '[SQL] slow query %.1f ms on %s %s: %s -- params %s',
+            elapsed * 1000, request.method, rule.rule if rule is not None else request.path,
+            ' '.join(statement.split())[:STATEMENT_LOG_LIMIT], _parameter_shape(parameters, executemany),
+        )
+
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute.
+    if context.connection is not None and context.cursor is not None:
+        started = context.connection.info.get('query_started')
+        if started:
+            started.pop()
+
+
+def instrument_engine(engine):
+    """Attach the cursor listeners to ``engine`` (once)."""
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(engine, 'handle_error', _handle_error)
+
+
+def _start_request():
+    g._query_stats = QueryStats()
+
+
+def _add_headers(response):
+    stats = g.get('_query_stats')
+    enabled = current_app.config['SQL_QUERY_HEADERS']
+    if enabled is None:
+        enabled = current_app.debug
+    if stats is not None and enabled:
+        response.headers['X-DB-Query-Count'] = str(stats.count)
+        response.headers['X-DB-Time-Ms'] = f'{stats.seconds * 1000:.2f}'
+    return response
+
+
+def current_query_stats():
+    """The running request's QueryStats, or None outside a request."""
+    return g.get('_query_stats') if has_request_context() else None
+
+
+def init_query_stats(app):
+    app.config.setdefault('SQL_QUERY_HEADERS', None)
+    app.config.setdefault('SQL_SLOW_QUERY_MS', 100)
+    app.config.setdefault('SQL_SLOW_QUERY_SAMPLE_RATE', 0.1)
+    with app.app_context():
+        instrument_engine(db.engine)
+    app.before_request(_start_request)
+    app.after_request(_add_headers)
+
+
+@contextmanager
+def max_queries(limit, engine=None):
+    """Fail if the block runs more than ``limit`` statements; yields the list of statements."""
+    engine = engine or db.engine
+    instrument_engine(engine)
+    statements = []
+    recorders = _local.__dict__.setdefault('recorders', [])
+    recorders.append(statements)
+    try:
+        yield statements
+    finally:
+        recorders.pop()
+    if len(statements) > limit:
+        listing = '\n'.join(f'  {i}. {" ".join(s.split())[:200]}' for i, s in enumerate(statements, 1))
+        raise AssertionError(f'{len(statements)} queries executed, expected at most {limit}:\n{listing}')
@@ -0,0 +1,105 @@
+"""
+In-process LRU/TTL cache for location-keyed query results.
+
+Nearby users share a cache entry by quantizing their coordinates to a small
+grid cell (``CACHE_CELL_DEG``, about 1 km).  Entries expire after a TTL and
+writers call ``invalidate()``; with several worker processes the TTL bounds
+how long another worker can serve a stale entry.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from geo import EARTH_RADIUS_KM
+
+CACHE_CELL_DEG = 0.01
+# Upper bound on the distance from a cell centre to any point in the cell.
+CACHE_CELL_RADIUS_KM = math.radians(CACHE_CELL_DEG) * EARTH_RADIUS_KM * math.sqrt(2) / 2
+
+
+def cache_cell(lat, lon):
+    """Quantize a coordinate to a cache cell, or None without a location."""
+    if lat is None or lon is None:
+        return None
+    return math.floor(lat / CACHE_CELL_DEG), math.floor(lon / CACHE_CELL_DEG)
+
+
+def cell_center(cell):
+    """Return the (lat, lon) at the middle of a cache cell."""
+    row, col = cell
+    return (row + 0.5) * CACHE_CELL_DEG, (col + 0.5) * CACHE_CELL_DEG
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache with per-entry expiry and hit/miss counters.
+
+    ``on_evict(value)``, if given, is called (outside the lock) for entries
+    dropped because they expired or the cache is full, not by ``invalidate()``.
+    """
+
+    def __init__(self, max_entries=1024, ttl_seconds=300, on_evict=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.on_evict = on_evict
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """Return the cached value for ``key`` or None on a miss."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+        if entry is not None:
+            self._evicted([entry[1]])
+        return None
+
+    def set(self, key, value):
+        evicted = []
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted.append(self._entries.popitem(last=False)[1][1])
+        self._evicted(evicted)
+
+    def _evicted(self, values):
+        if self.on_evict is not None:
+            for value in values:
+                self.on_evict(value)
+
+    def values(self):
+        """Snapshot of the cached values, expired or not."""
+        with self._lock:
+            return [entry[1] for entry in self._entries.values()]
+
+    def invalidate(self):
+        """Drop every entry, e.g. after a write to the underlying table."""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+                'invalidations': self.invalidations,
+            }
@@ -1,5 +1,10 @@
+import hashlib
+import json
+
 from flask import Blueprint, jsonify, request
 
+from etags import conditional
+
 emergency_bp = Blueprint('emergency_bp', __name__)
 
 # Emergency contacts by country/region (can be expanded)
@@ -33,7 +38,11 @@ EMERGENCY_CONTACTS = {
     }
 }
 
+# The contacts only change with a deploy, so their content is their version.
+CONTACTS_VERSION = hashlib.sha1(json.dumps(EMERGENCY_CONTACTS, sort_keys=True).encode()).hexdigest()
+
 @emergency_bp.route("/api/emergency", methods=["GET"])
+@conditional(static_version=CONTACTS_VERSION)
 def get_emergency_contacts():
     """Get emergency contacts based on location"""
     country = request.args.get('country', 'default')
@@ -46,6 +55,7 @@ def get_emergency_contacts():
     })
 
 @emergency_bp.route("/api/emergency/all", methods=["GET"])
+@conditional(static_version=CONTACTS_VERSION)
 def get_all_emergency_contacts():
     """Get all emergency contact information"""
     return jsonify(EMERGENCY_CONTACTS)
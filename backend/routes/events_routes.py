@@ -1,19 +1,71 @@
 from datetime import datetime
-import math
+from itertools import islice
 
-from flask import Blueprint, jsonify, request, g
+from flask import Blueprint, abort, jsonify, request, g
+from sqlalchemy import and_, func, or_
 
 from auth_utils import auth_required, get_optional_user
-from models import db, Event, EventComment
+from bulk_ingest import bulk_insert, bulk_records
+from geo import haversine_km
+from interest_counter import current_interest_counter
+from models import db, Event, EventCell, EventComment, EventTag, event_cells_covering, normalize_tags, parse_event_datetime
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, encode_cursor, invalid_page_args, page_args, page_response
+from projection import invalid_fields, project, requested_fields, row_dict
+from streaming import ndjson_response, wants_ndjson
 
 events_bp = Blueprint('events_bp', __name__)
 
+VISIBILITY_SCAN_BATCH = 500
+# Columns every visibility scan reads, whatever fields the client asked for.
+VISIBILITY_COLUMNS = ('id', 'date', 'latitude', 'longitude', 'visibility_radius_km')
+
+def _visible_events(lat, lon, fields, after=None, date_from=None, date_to=None):
+    """Yield (row, distance) for events visible from a point, in (date, id) order.
+
+    Rows are tuples of the columns behind ``fields`` plus those needed for
+    the visibility check and the keyset.
+    """
+    # The reverse-radius index narrows the scan to events whose visibility
+    # circle covers the point's cell at the level each event is stored at.
+    query = Event.query.join(EventCell, EventCell.event_id == Event.id).filter(event_cells_covering(lat, lon))
+    query = project(query, Event, fields, required=VISIBILITY_COLUMNS)
+    if date_from is not None:
+        query = query.filter(Event.date >= date_from)
+    if date_to is not None:
+        query = query.filter(Event.date <= date_to)
+    query = query.order_by(Event.date, Event.id)
+    while True:
+        batch_query = query
+        if after is not None:
+            after_date, after_id = after
+            batch_query = query.filter(or_(
+                Event.date > after_date,
+                and_(Event.date == after_date, Event.id > after_id),
+            ))
+        batch = batch_query.limit(VISIBILITY_SCAN_BATCH).all()
+
+        distances = haversine_km(lat, lon, [e.latitude for e in batch], [e.longitude for e in batch])
+        for row, distance in zip(batch, distances.tolist()):
+            # Only show events within the creator's set visibility radius
+            visibility_radius = row.visibility_radius_km or 10.0  # Default 10km
+            if distance <= visibility_radius:
+                yield row, distance
+
+        if len(batch) < VISIBILITY_SCAN_BATCH:
+            return
+        after = (batch[-1].date, batch[-1].id)
+
+def _stream_events(lat, lon, fields, date_from, date_to):
+    """Yield visible event dicts for an NDJSON export."""
+    for row, distance in _visible_events(lat, lon, fields, date_from=date_from, date_to=date_to):
+        yield row_dict(row, fields, round(distance, 2))
+
 @events_bp.route("/api/events", methods=["GET"])
 def get_events():
     """Get events - only show events within visibility radius of user's location"""
     lat = request.args.get('lat', type=float)
     lon = request.args.get('lon', type=float)
-    date_from = request.args.get('date_from')
+    include_past = request.args.get('include_past', '').lower() in ('1', 'true', 'yes')
 
     # Require location for radius-based visibility
     if lat is None or lon is None:
@@ -23,33 +75,104 @@ def get_events():
     if not user:
         return jsonify({'error': 'Login required to view events'}), 401
 
-    events = Event.query.all()
-    filtered_events = []
+    # Time window; past events are hidden unless asked for
+    try:
+        date_from = request.args.get('date_from')
+        date_from = parse_event_datetime(date_from) if date_from else None
+        date_to = request.args.get('date_to')
+        date_to = parse_event_datetime(date_to) if date_to else None
+    except ValueError:
+        return jsonify({'error': 'date_from and date_to must be ISO 8601 datetimes'}), 400
+    if date_from is None and not include_past:
+        date_from = datetime.utcnow()
 
-    # Filter events based on visibility radius
-    for event in events:
-        if event.latitude and event.longitude:
-            distance = calculate_distance(lat, lon, event.latitude, event.longitude)
-            # Only show events within the creator's set visibility radius
-            visibility_radius = event.visibility_radius_km or 10.0  # Default 10km
-            if distance <= visibility_radius:
-                event_dict = event.to_dict()
-                event_dict['distance'] = round(distance, 2)
-                filtered_events.append(event_dict)
-    
-    # Sort by date
-    filtered_events.sort(key=lambda x: x.get('date', ''))
-    
-    return jsonify(filtered_events)
+    try:
+        fields = requested_fields(Event, computed=('distance',))
+    except ValueError as exc:
+        return invalid_fields(exc)
+
+    if wants_ndjson():
+        return ndjson_response(_stream_events(lat, lon, fields, date_from, date_to))
+
+    try:
+        limit, after = page_args(str, int)
+        if after is not None:
+            after = (datetime.fromisoformat(after[0]), after[1])
+    except ValueError as exc:
+        return invalid_page_args(exc)
+
+    visible = _visible_events(lat, lon, fields, after, date_from, date_to)
+    next_key = None
+    if limit is not None:
+        visible = list(islice(visible, limit + 1))
+        if len(visible) > limit:
+            last = visible[limit - 1][0]
+            next_key = (last.date.isoformat(), last.id)
+        visible = visible[:limit]
+
+    # Events arrive sorted by date
+    filtered_events = [row_dict(row, fields, round(distance, 2)) for row, distance in visible]
+
+    if limit is None:
+        return jsonify(filtered_events)
+    return page_response(filtered_events, next_key)
 
 @events_bp.route("/api/events/<int:event_id>", methods=["GET"])
 def get_event(event_id):
     """Get a specific event with comments"""
     event = Event.query.get_or_404(event_id)
     event_dict = event.to_dict()
-    event_dict['comments'] = [comment.to_dict() for comment in event.comments]
+    event_dict['comment_count'] = db.session.query(func.count(EventComment.id)).filter(
+        EventComment.event_id == event_id
+    ).scalar()
+
+    # comments_limit embeds only the newest comments; the rest are paged
+    # through /api/events/<id>/comments starting at comments_next_cursor.
+    comments_limit = request.args.get('comments_limit', type=int)
+    if comments_limit is not None:
+        comments, next_key = _comments_page(event_id, min(max(comments_limit, 0), MAX_PAGE_SIZE))
+        event_dict['comments'] = [comment.to_dict() for comment in comments]
+        event_dict['comments_next_cursor'] = encode_cursor(next_key) if next_key else None
+    else:
+        comments = EventComment.query.filter(EventComment.event_id == event_id).order_by(
+            EventComment.created_at, EventComment.id
+        )
+        event_dict['comments'] = [comment.to_dict() for comment in comments]
     return jsonify(event_dict)
 
+def _comments_page(event_id, limit, after=None):
+    """Return one page of an event's comments, newest first, and the next key."""
+    if limit < 1:
+        return [], None
+    query = EventComment.query.filter(EventComment.event_id == event_id)
+    if after is not None:
+        after_created, after_id = after
+        query = query.filter(or_(
+            EventComment.created_at < after_created,
+            and_(EventComment.created_at == after_created, EventComment.id < after_id),
+        ))
+    comments = query.order_by(EventComment.created_at.desc(), EventComment.id.desc()).limit(limit + 1).all()
+    next_key = None
+    if len(comments) > limit:
+        last = comments[limit - 1]
+        next_key = (last.created_at.isoformat(), last.id)
+    return comments[:limit], next_key
+
+@events_bp.route("/api/events/<int:event_id>/comments", methods=["GET"])
+def get_comments(event_id):
+    """Get an event's comments, newest first, one keyset page at a time"""
+    if db.session.query(Event.id).filter(Event.id == event_id).first() is None:
+        abort(404)
+    try:
+        limit, after = page_args(str, int)
+        if after is not None:
+            after = (datetime.fromisoformat(after[0]), after[1])
+    except ValueError as exc:
+        return invalid_page_args(exc)
+
+    comments, next_key = _comments_page(event_id, limit or DEFAULT_PAGE_SIZE, after)
+    return page_response([comment.to_dict() for comment in comments], next_key)
+
 @events_bp.route("/api/events", methods=["POST"])
 @auth_required
 def post_event():
@@ -66,11 +189,11 @@ def post_event():
     date_str = data.get("date")
     if date_str:
         try:
-            event_date = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-        except:
-            event_date = datetime.now()
+            event_date = parse_event_datetime(date_str)
+        except (TypeError, ValueError):
+            event_date = datetime.utcnow()
     else:
-        event_date = datetime.now()
+        event_date = datetime.utcnow()
     
     organizer = data.get("organizer") or g.current_user.get('name') or "Anonymous"
     created_by = g.current_user.get('email') or g.current_user.get('id') or "anonymous"
@@ -93,13 +216,28 @@ def post_event():
     db.session.commit()
     return jsonify({"message": "Event added successfully", "event": new_event.to_dict()}), 201
 
+@events_bp.route("/api/events/bulk", methods=["POST"])
+@auth_required
+def post_events_bulk():
+    """Create many events from a JSON array; rejected records are reported, not fatal"""
+    records, error = bulk_records(request.get_json(silent=True))
+    if error:
+        return jsonify({"error": error}), 400
+    defaults = {
+        'organizer': g.current_user.get('name'),
+        'created_by': g.current_user.get('email') or g.current_user.get('id'),
+    }
+    return jsonify(bulk_insert('events', records, defaults=defaults))
+
 @events_bp.route("/api/events/<int:event_id>/interest", methods=["POST"])
 def mark_interest(event_id):
     """Mark interest in an event"""
-    event = Event.query.get_or_404(event_id)
-    event.interested_count += 1
-    db.session.commit()
-    return jsonify({"message": "Interest marked", "interested_count": event.interested_count})
+    stored = db.session.query(Event.interested_count).filter(Event.id == event_id).first()
+    if stored is None:
+        abort(404)
+    # Buffered and flushed in batches; the count returned is approximate
+    pending = current_interest_counter().increment(event_id)
+    return jsonify({"message": "Interest marked", "interested_count": (stored[0] or 0) + pending})
 
 @events_bp.route("/api/events/<int:event_id>/comments", methods=["POST"])
 def add_comment(event_id):
@@ -125,20 +263,19 @@ def suggest_events():
     from ai_helper import generate_event_suggestion
     suggestion = generate_event_suggestion(interest, location)
     
-    # Also get actual events matching the interest
-    events = Event.query.filter(Event.tags.contains(interest)).all() if interest else []
+    # Also get actual events matching the interest, ranked by how many of the
+    # requested tags they share
+    tags = normalize_tags(interest)
+    events = []
+    if tags:
+        overlap = func.count(EventTag.tag).label('overlap')
+        ranked = db.session.query(EventTag.event_id, overlap).filter(
+            EventTag.tag.in_(tags)
+        ).group_by(EventTag.event_id).order_by(overlap.desc(), EventTag.event_id).limit(5).all()
+        by_id = {e.id: e for e in Event.query.filter(Event.id.in_([row.event_id for row in ranked]))}
+        events = [by_id[row.event_id] for row in ranked if row.event_id in by_id]
     
     return jsonify({
         "suggestion": suggestion,
-        "events": [e.to_dict() for e in events[:5]]
+        "events": [e.to_dict() for e in events]
     })
-
-def calculate_distance(lat1, lon1, lat2, lon2):
-    """Calculate distance between two coordinates in kilometers"""
-    R = 6371  # Earth's radius in km
-    dlat = math.radians(lat2 - lat1)
-    dlon = math.radians(lon2 - lon1)
-    a = math.sin(dlat/2)**2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon/2)**2
-    c = 2 * math.asin(math.sqrt(a))
-    return R * c
-
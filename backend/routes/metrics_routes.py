@@ -0,0 +1,11 @@
+from flask import Blueprint, current_app
+
+from metrics import CONTENT_TYPE, registry
+
+metrics_bp = Blueprint('metrics_bp', __name__)
+
+
+@metrics_bp.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Request and outbound-call metrics in Prometheus text format."""
+    return current_app.response_class(registry.render(), content_type=CONTENT_TYPE)
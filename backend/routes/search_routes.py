@@ -0,0 +1,117 @@
+from datetime import datetime
+import re
+
+from flask import Blueprint, jsonify, request
+from sqlalchemy import column, func, literal_column, select, table
+
+from auth_utils import get_optional_user
+from geo import bounding_box_filter, geocell_filter, haversine_km
+from models import db, Event, EventCell, Stay, TouristSpot, event_cells_covering, fulltext_table
+
+search_bp = Blueprint('search_bp', __name__)
+
+DEFAULT_SEARCH_LIMIT = 10
+MAX_SEARCH_LIMIT = 50
+SEARCH_TYPES = {
+    'stays': Stay,
+    'tourist_spots': TouristSpot,
+    'events': Event,
+}
+
+
+def build_match_query(text, prefix=False):
+    """Turn free text into an FTS5 MATCH expression.
+
+    Every word is quoted so user input can never produce FTS syntax errors.
+    A word typed with a trailing ``*`` (or the last word when ``prefix`` is
+    set, for search-as-you-type) matches as a prefix.
+    """
+    words = re.findall(r'\w+\*?', text or '')
+    terms = []
+    for i, word in enumerate(words):
+        is_prefix = word.endswith('*') or (prefix and i == len(words) - 1)
+        terms.append('"%s"%s' % (word.rstrip('*'), '*' if is_prefix else ''))
+    return ' '.join(terms)
+
+
+def _ranked_matches(model, match, limit, lat=None, lon=None, max_distance=None):
+    """Return [(row id, bm25 rank, distance)] best first for one table."""
+    fts_name = fulltext_table(model.__tablename__)
+    fts = table(fts_name, column('rowid'))
+    rank = func.bm25(literal_column(fts_name)).label('rank')
+    columns = [model.id, rank, model.latitude, model.longitude]
+    if model is Event:
+        columns.append(Event.visibility_radius_km)
+    stmt = (
+        select(*columns)
+        .select_from(fts.join(model.__table__, model.id == fts.c.rowid))
+        .where(literal_column(fts_name).op('MATCH')(match))
+        .order_by(rank, model.id)
+    )
+
+    if model is Event:
+        # Events follow the same visibility rules as /api/events.
+        stmt = stmt.join(EventCell, EventCell.event_id == Event.id).where(
+            event_cells_covering(lat, lon), Event.date >= datetime.utcnow()
+        )
+    elif max_distance is not None:
+        stmt = stmt.where(
+            geocell_filter(model.geocell, lat, lon, max_distance),
+            bounding_box_filter(model.latitude, model.longitude, lat, lon, max_distance),
+        )
+    else:
+        return [(row.id, row.rank, None) for row in db.session.execute(stmt.limit(limit))]
+
+    # Geo-restricted searches rank light tuples and apply the exact distance
+    # check before cutting to the limit.
+    rows = db.session.execute(stmt).all()
+    distances = haversine_km(lat, lon, [r.latitude for r in rows], [r.longitude for r in rows]).tolist()
+    matches = []
+    for row, distance in zip(rows, distances):
+        radius = (row.visibility_radius_km or 10.0) if model is Event else max_distance
+        if distance <= radius:
+            matches.append((row.id, row.rank, distance))
+            if len(matches) == limit:
+                break
+    return matches
+
+
+@search_bp.route("/api/search", methods=["GET"])
+def search():
+    """Full-text search across stays, tourist spots and events (BM25 ranked)"""
+    match = build_match_query(request.args.get('q', ''), request.args.get('prefix', '').lower() in ('1', 'true', 'yes'))
+    if not match:
+        return jsonify({'error': 'Search query required'}), 400
+
+    lat = request.args.get('lat', type=float)
+    lon = request.args.get('lon', type=float)
+    has_location = lat is not None and lon is not None
+    max_distance = request.args.get('distance', type=float) if has_location else None
+    limit = min(max(request.args.get('limit', type=int, default=DEFAULT_SEARCH_LIMIT), 1), MAX_SEARCH_LIMIT)
+
+    requested = request.args.get('types')
+    types = [t.strip() for t in requested.split(',')] if requested else list(SEARCH_TYPES)
+    unknown = [t for t in types if t not in SEARCH_TYPES]
+    if unknown:
+        return jsonify({'error': f"Unknown search types: {', '.join(unknown)}"}), 400
+
+    results = {}
+    for type_name in types:
+        model = SEARCH_TYPES[type_name]
+        if model is Event and (not has_location or not get_optional_user()):
+            # Event visibility depends on the viewer's location and login.
+            results[type_name] = []
+            continue
+
+        matches = _ranked_matches(model, match, limit, lat, lon, max_distance)
+        rows = {row.id: row for row in model.query.filter(model.id.in_([m[0] for m in matches]))}
+        items = []
+        for row_id, rank, distance in matches:
+            item = rows[row_id].to_dict()
+            item['rank'] = round(rank, 4)
+            if distance is not None:
+                item['distance'] = round(distance, 2)
+            items.append(item)
+        results[type_name] = items
+
+    return jsonify({'query': request.args.get('q', ''), 'results': results})
@@ -1,10 +1,34 @@
 from flask import Blueprint, jsonify, request
+from bulk_ingest import bulk_insert, bulk_records
+from etags import conditional
 from models import db, Stay
-import math
+from geo import bounding_box_filter, geocell_filter, haversine_km
+from pagination import invalid_page_args, nearest_page, page_args, page_response
+from projection import invalid_fields, project, projected_columns, requested_fields, row_dict
+from streaming import STREAM_BATCH_SIZE, iter_with_distance, ndjson_response, wants_ndjson
 
 stays_bp = Blueprint('stays_bp', __name__)
 
+def build_stays_query(lat=None, lon=None, max_distance=None, max_price=None, min_rating=None):
+    """Build one indexed query for the stay listing filters.
+
+    With a location, rows are limited to the geocells and bounding box around
+    ``max_distance``; callers still apply the exact distance check.
+    """
+    query = Stay.query
+    if lat and lon:
+        query = query.filter(
+            geocell_filter(Stay.geocell, lat, lon, max_distance),
+            bounding_box_filter(Stay.latitude, Stay.longitude, lat, lon, max_distance),
+        )
+    if max_price:
+        query = query.filter(Stay.price_per_night <= max_price)
+    if min_rating:
+        query = query.filter(Stay.rating >= min_rating)
+    return query.order_by(Stay.id)
+
 @stays_bp.route("/api/stays", methods=["GET"])
+@conditional('stays')
 def get_stays():
     """Get all stays or filter by location/distance"""
     lat = request.args.get('lat', type=float)
@@ -13,35 +37,66 @@ def get_stays():
     max_price = request.args.get('max_price', type=float)
     min_rating = request.args.get('min_rating', type=float)
     
-    stays = Stay.query.all()
+    try:
+        fields = requested_fields(Stay, computed=('distance',))
+    except ValueError as exc:
+        return invalid_fields(exc)
+    
+    query = build_stays_query(lat, lon, max_distance, max_price, min_rating)
+    
+    if wants_ndjson():
+        return ndjson_response(_stream_stays(query, fields, lat, lon, max_distance))
+    
+    try:
+        limit, after = page_args((int, float), int) if lat and lon else page_args(int)
+    except ValueError as exc:
+        return invalid_page_args(exc)
+    
+    if limit is not None:
+        return _stays_page(query, fields, lat, lon, max_distance, limit, after)
     
     # Filter by distance if location provided
     if lat and lon:
-        filtered_stays = []
-        for stay in stays:
-            distance = calculate_distance(lat, lon, stay.latitude, stay.longitude)
+        rows = project(query, Stay, fields, required=('latitude', 'longitude')).all()
+        distances = haversine_km(lat, lon, [r.latitude for r in rows], [r.longitude for r in rows])
+        nearby = []
+        for row, distance in zip(rows, distances.tolist()):
             if distance <= max_distance:
-                stay_dict = stay.to_dict()
-                stay_dict['distance'] = round(distance, 2)
-                filtered_stays.append(stay_dict)
+                nearby.append((round(distance, 2), row))
         
         # Sort by distance
-        filtered_stays.sort(key=lambda x: x['distance'])
-        stays_list = filtered_stays
+        nearby.sort(key=lambda item: item[0])
+        stays_list = [row_dict(row, fields, distance) for distance, row in nearby]
     else:
-        stays_list = [stay.to_dict() for stay in stays]
-    
-    # Filter by price
-    if max_price:
-        stays_list = [s for s in stays_list if s.get('price_per_night', 0) <= max_price]
-    
-    # Filter by rating
-    if min_rating:
-        stays_list = [s for s in stays_list if s.get('rating', 0) >= min_rating]
+        stays_list = [row_dict(row, fields) for row in project(query, Stay, fields)]
     
     return jsonify(stays_list)
 
+def _stream_stays(query, fields, lat, lon, max_distance):
+    """Yield stay dicts for an NDJSON export, one fetch batch at a time."""
+    if lat and lon:
+        query = project(query, Stay, fields, required=('latitude', 'longitude'))
+        for row, distance in iter_with_distance(query, lat, lon, max_distance):
+            yield row_dict(row, fields, round(distance, 2))
+    else:
+        for row in project(query, Stay, fields).yield_per(STREAM_BATCH_SIZE):
+            yield row_dict(row, fields)
+
+def _stays_page(query, fields, lat, lon, max_distance, limit, after):
+    """Serve one keyset page of stays, by (distance, id) or by id."""
+    if lat and lon:
+        columns = projected_columns(Stay, fields, required=('id',))
+        page, next_key = nearest_page(query, Stay, lat, lon, limit, after, max_distance, columns)
+        return page_response([row_dict(row, fields, distance) for row, distance in page], next_key)
+    
+    if after is not None:
+        query = query.filter(Stay.id > after[0])
+    rows = project(query, Stay, fields, required=('id',)).limit(limit + 1).all()
+    next_key = (rows[limit - 1].id,) if len(rows) > limit else None
+    return page_response([row_dict(row, fields) for row in rows[:limit]], next_key)
+
 @stays_bp.route("/api/stays/<int:stay_id>", methods=["GET"])
+@conditional('stays')
 def get_stay(stay_id):
     """Get a specific stay by ID"""
     stay = Stay.query.get_or_404(stay_id)
@@ -66,12 +121,10 @@ def create_stay():
     db.session.commit()
     return jsonify({"message": "Stay added successfully", "stay": new_stay.to_dict()}), 201
 
-def calculate_distance(lat1, lon1, lat2, lon2):
-    """Calculate distance between two coordinates in kilometers"""
-    R = 6371  # Earth's radius in km
-    dlat = math.radians(lat2 - lat1)
-    dlon = math.radians(lon2 - lon1)
-    a = math.sin(dlat/2)**2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon/2)**2
-    c = 2 * math.asin(math.sqrt(a))
-    return R * c
-
+@stays_bp.route("/api/stays/bulk", methods=["POST"])
+def create_stays_bulk():
+    """Create many stays from a JSON array; invalid records are reported, not fatal"""
+    records, error = bulk_records(request.get_json(silent=True))
+    if error:
+        return jsonify({"error": error}), 400
+    return jsonify(bulk_insert('stays', records))
@@ -1,11 +1,24 @@
 from flask import Blueprint, jsonify, request
-from models import db, TouristSpot
-import math
+from bulk_ingest import bulk_insert, bulk_records
+from etags import conditional, table_version
+from models import db, TouristSpot, spot_rating_score
+from geo import bounding_box_filter, geocell_filter, haversine_km
+from pagination import invalid_page_args, nearest_page, page_args, page_response
+from projection import API_FIELDS, invalid_fields, narrow, project, projected_columns, requested_fields, row_dict
+from result_cache import CACHE_CELL_RADIUS_KM, ResultCache, cache_cell, cell_center
+from streaming import STREAM_BATCH_SIZE, iter_with_distance, ndjson_response, wants_ndjson
+import heapq
 import random
 
 tourist_bp = Blueprint('tourist_bp', __name__)
 
+# Serves hot listings and recommendation cells without touching the database.
+# Keys include the tourist_spots version, so any write, from any process,
+# makes the old entries unreachable; the TTL only frees their memory.
+spot_cache = ResultCache(max_entries=2048, ttl_seconds=300)
+
 @tourist_bp.route("/api/tourist-spots", methods=["GET"])
+@conditional('tourist_spots', unless=lambda: request.args.get('surprise', type=bool, default=False))
 def get_tourist_spots():
     """Get all tourist spots or filter by location"""
     lat = request.args.get('lat', type=float)
@@ -13,32 +26,141 @@ def get_tourist_spots():
     category = request.args.get('category')
     surprise = request.args.get('surprise', type=bool, default=False)
     
-    spots = TouristSpot.query.all()
-    
+    query = TouristSpot.query
     if category:
-        spots = [s for s in spots if s.category == category]
+        query = query.filter(TouristSpot.category == category)
+    query = query.order_by(TouristSpot.id)
+    
+    if surprise:
+        return _surprise_spot(
+            query, lat, lon,
+            radius=request.args.get('distance', type=float),
+            weighted=request.args.get('weight') == 'rating',
+        )
+    
+    try:
+        fields = requested_fields(TouristSpot, computed=('distance',))
+    except ValueError as exc:
+        return invalid_fields(exc)
+    
+    if wants_ndjson():
+        return ndjson_response(_stream_spots(query, fields, lat, lon))
+    try:
+        limit, after = page_args((int, float), int) if lat and lon else page_args(int)
+    except ValueError as exc:
+        return invalid_page_args(exc)
+    if limit is not None:
+        return _spots_page(query, fields, lat, lon, limit, after)
+    
+    # The listing has no radius, so one cached copy per category serves every
+    # location; distances and field selection are applied per request.
+    cache_key = ('spots', table_version('tourist_spots'), category)
+    spot_dicts = spot_cache.get(cache_key)
+    if spot_dicts is None:
+        all_fields = API_FIELDS[TouristSpot]
+        spot_dicts = [row_dict(row, all_fields) for row in project(query, TouristSpot, all_fields)]
+        spot_cache.set(cache_key, spot_dicts)
     
     if lat and lon:
-        spots_with_distance = []
-        for spot in spots:
-            distance = calculate_distance(lat, lon, spot.latitude, spot.longitude)
-            spot_dict = spot.to_dict()
-            spot_dict['distance'] = round(distance, 2)
-            spots_with_distance.append(spot_dict)
-        
-        spots_with_distance.sort(key=lambda x: x['distance'])
-        
-        # Surprise me feature - return a random spot
-        if surprise:
-            random_spot = random.choice(spots_with_distance)
-            return jsonify(random_spot)
+        distances = haversine_km(lat, lon, [s['latitude'] for s in spot_dicts], [s['longitude'] for s in spot_dicts])
+        nearby = [(round(distance, 2), spot_dict) for spot_dict, distance in zip(spot_dicts, distances.tolist())]
+        nearby.sort(key=lambda item: item[0])
         
+        spots_with_distance = []
+        for distance, spot_dict in nearby:
+            item = narrow(spot_dict, fields)
+            if 'distance' in fields:
+                item['distance'] = distance
+            spots_with_distance.append(item)
         return jsonify(spots_with_distance)
     
-    return jsonify([spot.to_dict() for spot in spots])
+    return jsonify([narrow(spot_dict, fields) for spot_dict in spot_dicts])
+
+
+def _surprise_spot(query, lat, lon, radius=None, weighted=False):
+    """Surprise me feature - return one random spot without ranking the rest.
+
+    With a radius, the draw is over the geocell candidates inside it.
+    Otherwise a uniform draw is a single OFFSET into the id index, and a
+    rating-weighted draw is one reservoir pass over (id, rating) tuples.
+    """
+    has_location = bool(lat and lon)
+    if radius is not None and has_location:
+        candidates = query.filter(
+            geocell_filter(TouristSpot.geocell, lat, lon, radius),
+            bounding_box_filter(TouristSpot.latitude, TouristSpot.longitude, lat, lon, radius),
+        ).with_entities(TouristSpot.id, TouristSpot.latitude, TouristSpot.longitude, TouristSpot.rating).all()
+        distances = haversine_km(lat, lon, [c.latitude for c in candidates], [c.longitude for c in candidates])
+        candidates = [c for c, distance in zip(candidates, distances.tolist()) if distance <= radius]
+        if weighted:
+            spot_id = _weighted_choice((c.id, c.rating) for c in candidates)
+        else:
+            spot_id = random.choice(candidates).id if candidates else None
+        spot = TouristSpot.query.get(spot_id) if spot_id is not None else None
+    elif weighted:
+        spot_id = _weighted_choice(query.with_entities(TouristSpot.id, TouristSpot.rating).yield_per(STREAM_BATCH_SIZE))
+        spot = TouristSpot.query.get(spot_id) if spot_id is not None else None
+    else:
+        count = query.count()
+        spot = query.offset(random.randrange(count)).first() if count else None
+
+    if spot is None:
+        return jsonify({'error': 'No tourist spots found'}), 404
+
+    spot_dict = spot.to_dict()
+    if has_location:
+        distance = haversine_km(lat, lon, [spot.latitude], [spot.longitude]).item()
+        spot_dict['distance'] = round(distance, 2)
+    return jsonify(spot_dict)
+
+
+def _weighted_choice(rows):
+    """Pick an id from (id, rating) rows with probability proportional to rating.
+
+    Uses weighted reservoir sampling (Efraimidis-Spirakis), so the rows are
+    consumed in one streaming pass.  Falls back to a uniform draw when no row
+    has a positive rating.
+    """
+    best_key, best_id = -1.0, None
+    seen, uniform_id = 0, None
+    for spot_id, rating in rows:
+        seen += 1
+        if random.randrange(seen) == 0:
+            uniform_id = spot_id
+        if rating and rating > 0:
+            key = random.random() ** (1 / rating)
+            if key > best_key:
+                best_key, best_id = key, spot_id
+    return best_id if best_id is not None else uniform_id
+
+
+def _stream_spots(query, fields, lat, lon):
+    """Yield tourist spot dicts for an NDJSON export, one fetch batch at a time."""
+    if lat and lon:
+        query = project(query, TouristSpot, fields, required=('latitude', 'longitude'))
+        for row, distance in iter_with_distance(query, lat, lon):
+            yield row_dict(row, fields, round(distance, 2))
+    else:
+        for row in project(query, TouristSpot, fields).yield_per(STREAM_BATCH_SIZE):
+            yield row_dict(row, fields)
+
+
+def _spots_page(query, fields, lat, lon, limit, after):
+    """Serve one keyset page of tourist spots, by (distance, id) or by id."""
+    if lat and lon:
+        columns = projected_columns(TouristSpot, fields, required=('id',))
+        page, next_key = nearest_page(query, TouristSpot, lat, lon, limit, after, columns=columns)
+        return page_response([row_dict(row, fields, distance) for row, distance in page], next_key)
+    
+    if after is not None:
+        query = query.filter(TouristSpot.id > after[0])
+    rows = project(query, TouristSpot, fields, required=('id',)).limit(limit + 1).all()
+    next_key = (rows[limit - 1].id,) if len(rows) > limit else None
+    return page_response([row_dict(row, fields) for row in rows[:limit]], next_key)
 
 
 @tourist_bp.route("/api/tourist-spots/recommendations", methods=["GET"])
+@conditional('tourist_spots')
 def get_tourist_recommendations():
     """Return recommended spots using rating/distance weighting."""
     lat = request.args.get('lat', type=float)
@@ -46,41 +168,116 @@ def get_tourist_recommendations():
     limit = request.args.get('limit', type=int, default=5)
     preference = request.args.get('preference', default='balanced')
 
-    spots = TouristSpot.query.all()
-    recommendations = []
+    has_location = lat is not None and lon is not None
 
-    for spot in spots:
-        spot_dict = spot.to_dict()
-        rating = spot.rating or 0
-        distance = None
+    # Users in the same ~1 km cell share one candidate pool computed at the
+    # cell centre; the final ranking below is exact for each request.
+    cell = cache_cell(lat, lon)
+    cache_key = ('recommendations', table_version('tourist_spots'), cell, preference, limit)
+    pool = spot_cache.get(cache_key)
+    if pool is None:
+        center_lat, center_lon = cell_center(cell) if cell else (None, None)
+        pool = _recommendation_pool(center_lat, center_lon, limit, preference)
+        spot_cache.set(cache_key, pool)
 
-        if lat is not None and lon is not None:
-            distance = calculate_distance(lat, lon, spot.latitude, spot.longitude)
-            spot_dict['distance'] = round(distance, 2)
+    if has_location:
+        distances = haversine_km(lat, lon, [s['latitude'] for s, _ in pool], [s['longitude'] for s, _ in pool]).tolist()
+    else:
+        distances = [None] * len(pool)
 
-        rating_score = (rating / 5) * 0.65
-        proximity_score = 0
+    candidates = (
+        (spot_dict, spot_dict.get('rating'), _score(rating_score, distance), distance)
+        for (spot_dict, rating_score), distance in zip(pool, distances)
+    )
+    recommendations = []
+    for spot_dict, _, score, distance in _top_recommendations(candidates, limit, preference, has_location):
+        spot_dict = dict(spot_dict)
         if distance is not None:
-            # Anything within 2km is perfect, 20km+ contributes very little.
-            proximity_score = max(0, 1 - (distance / 20))
-            proximity_score *= 0.35
-        else:
-            proximity_score = 0.15  # slight boost when distance unknown
-
-        combined_score = rating_score + proximity_score
-        spot_dict['score'] = round(combined_score, 3)
+            spot_dict['distance'] = round(distance, 2)
+        spot_dict['score'] = score
         recommendations.append(spot_dict)
 
-    if preference == 'closest' and lat is not None and lon is not None:
-        recommendations.sort(key=lambda x: x.get('distance', float('inf')))
-    elif preference == 'rating':
-        recommendations.sort(key=lambda x: x.get('rating', 0), reverse=True)
+    return jsonify(recommendations)
+
+
+def _score(rating_score, distance):
+    """Combined recommendation score for a spot."""
+    if distance is not None:
+        # Anything within 2km is perfect, 20km+ contributes very little.
+        proximity_score = max(0, 1 - (distance / 20))
+        proximity_score *= 0.35
     else:
-        recommendations.sort(key=lambda x: x.get('score', 0), reverse=True)
+        proximity_score = 0.15  # slight boost when distance unknown
+    return round(rating_score + proximity_score, 3)
 
-    return jsonify(recommendations[:limit])
+
+def _top_recommendations(candidates, limit, preference, has_location):
+    """
+    Pick the best ``limit`` of (item, rating, score, distance) candidates.
+
+    Bounded heaps keep the same order as a full stable sort sliced to
+    ``limit``, so candidates must arrive in id order.
+    """
+    if preference == 'closest' and has_location:
+        return heapq.nsmallest(limit, candidates, key=lambda c: round(c[3], 2))
+    if preference == 'rating':
+        return heapq.nlargest(limit, candidates, key=lambda c: c[1] or 0)
+    return heapq.nlargest(limit, candidates, key=lambda c: c[2])
+
+
+def _recommendation_pool(lat, lon, limit, preference):
+    """
+    Return (serialized spot, rating score) pairs, in id order, for the spots
+    that can win anywhere in a cache cell.
+
+    A user is at most ``CACHE_CELL_RADIUS_KM`` from the centre, which moves
+    each distance by at most that much, so besides the winners at the centre
+    the pool keeps every spot within that margin of the last winner.
+    """
+    has_location = lat is not None and lon is not None
+    # Score light (id, coordinates, rating) tuples; only the pool is loaded
+    # and serialized.
+    rows = TouristSpot.query.with_entities(
+        TouristSpot.id, TouristSpot.latitude, TouristSpot.longitude,
+        TouristSpot.rating, TouristSpot.rating_score,
+    ).order_by(TouristSpot.id).all()
+
+    if has_location:
+        distances = haversine_km(lat, lon, [r.latitude for r in rows], [r.longitude for r in rows]).tolist()
+    else:
+        distances = [None] * len(rows)
+
+    rating_scores = {}
+    candidates = []
+    for row, distance in zip(rows, distances):
+        rating_score = row.rating_score
+        if rating_score is None:
+            rating_score = spot_rating_score(row.rating)
+        rating_scores[row.id] = rating_score
+        candidates.append((row.id, row.rating, _score(rating_score, distance), distance))
+
+    winners = _top_recommendations(candidates, limit, preference, has_location)
+    if not winners or not has_location or preference == 'rating':
+        pool_ids = {c[0] for c in winners}
+    elif preference == 'closest':
+        # Two cell radii of drift plus the 0.01 km rounding of the sort key.
+        bound = round(winners[-1][3], 2) + 2 * CACHE_CELL_RADIUS_KM + 0.01
+        pool_ids = {c[0] for c in candidates if c[3] <= bound}
+    else:
+        # The proximity term changes by 0.35 / 20 per km, plus score rounding.
+        bound = winners[-1][2] - 2 * CACHE_CELL_RADIUS_KM * 0.35 / 20 - 0.001
+        pool_ids = {c[0] for c in candidates if c[2] >= bound}
+
+    spots = TouristSpot.query.filter(TouristSpot.id.in_(pool_ids)).order_by(TouristSpot.id)
+    return [(spot.to_dict(), rating_scores[spot.id]) for spot in spots]
+
+@tourist_bp.route("/api/tourist-spots/cache-stats", methods=["GET"])
+def get_tourist_cache_stats():
+    """Hit/miss counters for the tourist spot result cache"""
+    return jsonify(spot_cache.stats())
 
 @tourist_bp.route("/api/tourist-spots/<int:spot_id>", methods=["GET"])
+@conditional('tourist_spots')
 def get_tourist_spot(spot_id):
     """Get a specific tourist spot by ID"""
     spot = TouristSpot.query.get_or_404(spot_id)
@@ -103,12 +300,10 @@ def create_tourist_spot():
     db.session.commit()
     return jsonify({"message": "Tourist spot added successfully", "spot": new_spot.to_dict()}), 201
 
-def calculate_distance(lat1, lon1, lat2, lon2):
-    """Calculate distance between two coordinates in kilometers"""
-    R = 6371  # Earth's radius in km
-    dlat = math.radians(lat2 - lat1)
-    dlon = math.radians(lon2 - lon1)
-    a = math.sin(dlat/2)**2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon/2)**2
-    c = 2 * math.asin(math.sqrt(a))
-    return R * c
-
+@tourist_bp.route("/api/tourist-spots/bulk", methods=["POST"])
+def create_tourist_spots_bulk():
+    """Create many tourist spots from a JSON array; invalid records are reported, not fatal"""
+    records, error = bulk_records(request.get_json(silent=True))
+    if error:
+        return jsonify({"error": error}), 400
+    return jsonify(bulk_insert('tourist_spots', records))
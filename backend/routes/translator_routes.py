@@ -1,13 +1,16 @@
 from flask import Blueprint, jsonify, request
-import requests
 import json
 
+from metrics import outbound_call
+
 translator_bp = Blueprint('translator_bp', __name__)
 
 # Multiple translation service options
 def translate_with_libretranslate(text, source_lang, target_lang):
     """Use LibreTranslate (free, open-source) API"""
     try:
+        import requests
+
         # Using public LibreTranslate instance
         url = "https://libretranslate.de/translate"
         payload = {
@@ -16,7 +19,8 @@ def translate_with_libretranslate(text, source_lang, target_lang):
             "target": target_lang,
             "format": "text"
         }
-        response = requests.post(url, data=payload, timeout=10)
+        with outbound_call('libretranslate'):
+            response = requests.post(url, data=payload, timeout=10)
         if response.status_code == 200:
             data = response.json()
             return data.get("translatedText", text)
@@ -28,12 +32,15 @@ def translate_with_libretranslate(text, source_lang, target_lang):
 def translate_with_mymemory(text, source_lang, target_lang):
     """Fallback to MyMemory API"""
     try:
+        import requests
+
         url = f"https://api.mymemory.translated.net/get"
         params = {
             "q": text,
             "langpair": f"{source_lang}|{target_lang}"
         }
-        response = requests.get(url, params=params, timeout=10)
+        with outbound_call('mymemory'):
+            response = requests.get(url, params=params, timeout=10)
         if response.status_code == 200:
             data = response.json()
             if data.get("responseStatus") == 200:
@@ -46,6 +53,8 @@ def translate_with_mymemory(text, source_lang, target_lang):
 def translate_with_google_translate_api(text, source_lang, target_lang):
     """Using Google Translate (unofficial API)"""
     try:
+        import requests
+
         # Using a free Google Translate API wrapper
         url = "https://translate.googleapis.com/translate_a/single"
         params = {
@@ -58,7 +67,8 @@ def translate_with_google_translate_api(text, source_lang, target_lang):
         headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
         }
-        response = requests.get(url, params=params, headers=headers, timeout=10)
+        with outbound_call('google_translate'):
+            response = requests.get(url, params=params, headers=headers, timeout=10)
         if response.status_code == 200:
             try:
                 data = response.json()
@@ -130,6 +140,8 @@ def translate_text():
 def detect_language():
     """Detect the language of the input text"""
     try:
+        import requests
+
         data = request.json
         text = data.get("text", "").strip()
         
@@ -146,7 +158,8 @@ def detect_language():
             "q": text
         }
         
-        response = requests.get(url, params=params, timeout=10)
+        with outbound_call('google_translate'):
+            response = requests.get(url, params=params, timeout=10)
         if response.status_code == 200:
             try:
                 data = response.json()
@@ -3,11 +3,13 @@ Seed script to populate database with sample data
 Run this script to add initial data for testing
 """
 
-from app import app
+from app import create_app
 from models import db, Stay, TouristSpot, Event, Friend
 from datetime import datetime, timedelta
 
 def seed_database():
+    # No blueprints: seeding only needs the database.
+    app = create_app({'BLUEPRINTS': ()})
     with app.app_context():
         # Clear existing data (optional - comment out if you want to keep existing data)
         # db.drop_all()
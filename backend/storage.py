@@ -0,0 +1,167 @@
+"""
+Storage profiles for the SQLite database.
+
+A profile bundles the connection settings that decide how well SQLite copes
+with concurrent readers and writers: journal mode, synchronous level,
+memory-mapped I/O, page cache, busy timeout, connection pool size and the
+statement caches.  PRAGMAs are applied to every new DBAPI connection through
+an engine ``connect`` event, because most of them are per-connection.
+
+The profile is chosen with ``STORAGE_PROFILE`` (``production`` by default)
+and any single setting can be overridden through config or environment,
+e.g. ``SQLITE_SYNCHRONOUS=FULL``.  ``legacy`` reproduces the original
+defaults (rollback journal, no mmap, no pool tuning) for comparison.
+"""
+
+import os
+
+from sqlalchemy import event
+
+from models import db
+
+DEFAULT_DATABASE_URI = 'sqlite:///database.sqlite'
+
+STORAGE_PROFILES = {
+    # SQLite and SQLAlchemy defaults: writers block every reader.
+    'legacy': {
+        'journal_mode': None,
+        'synchronous': None,
+        'mmap_size': None,
+        'cache_size_kib': None,
+        'busy_timeout_ms': None,
+        'pool_size': None,
+        'max_overflow': None,
+        'statement_cache_size': None,
+    },
+    # WAL lets readers run alongside the single writer; NORMAL sync is
+    # durable against application crashes (a power loss can drop the last
+    # commits, never corrupt the file).
+    'production': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size_kib': 64 * 1024,
+        'busy_timeout_ms': 5000,
+        'pool_size': 10,
+        'max_overflow': 20,
+        'statement_cache_size': 256,
+    },
+    # Same as production but fsyncs on every commit.
+    'durable': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size_kib': 64 * 1024,
+        'busy_timeout_ms': 5000,
+        'pool_size': 10,
+        'max_overflow': 20,
+        'statement_cache_size': 256,
+    },
+}
+
+JOURNAL_MODES = {'DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF'}
+SYNCHRONOUS_LEVELS = {'OFF', 'NORMAL', 'FULL', 'EXTRA'}
+_INTEGER_SETTINGS = (
+    'mmap_size', 'cache_size_kib', 'busy_timeout_ms', 'pool_size', 'max_overflow', 'statement_cache_size',
+)
+
+
+def _setting_key(name):
+    if name in ('pool_size', 'max_overflow', 'statement_cache_size'):
+        return 'DB_' + name.upper()
+    return 'SQLITE_' + name.upper()
+
+
+def storage_settings(config):
+    """Resolve the active profile plus per-setting overrides from config/env."""
+    profile = config.get('STORAGE_PROFILE') or os.getenv('STORAGE_PROFILE', 'production')
+    if profile not in STORAGE_PROFILES:
+        raise ValueError(f"Unknown STORAGE_PROFILE {profile!r}; choose from {', '.join(STORAGE_PROFILES)}")
+
+    settings = dict(STORAGE_PROFILES[profile])
+    for name in settings:
+        key = _setting_key(name)
+        value = config.get(key, os.getenv(key))
+        if value is None or value == '':
+            continue
+        settings[name] = int(value) if name in _INTEGER_SETTINGS else str(value).upper()
+
+    if settings['journal_mode'] is not None and settings['journal_mode'] not in JOURNAL_MODES:
+        raise ValueError(f"Invalid SQLITE_JOURNAL_MODE {settings['journal_mode']!r}")
+    if settings['synchronous'] is not None and settings['synchronous'] not in SYNCHRONOUS_LEVELS:
+        raise ValueError(f"Invalid SQLITE_SYNCHRONOUS {settings['synchronous']!r}")
+    settings['profile'] = profile
+    return settings
+
+
+def sqlite_pragmas(settings):
+    """PRAGMA statements to run on each new connection for ``settings``."""
+    pragmas = []
+    if settings['journal_mode']:
+        pragmas.append(f"PRAGMA journal_mode={settings['journal_mode']}")
+    if settings['synchronous']:
+        pragmas.append(f"PRAGMA synchronous={settings['synchronous']}")
+    if settings['mmap_size'] is not None:
+        pragmas.append(f"PRAGMA mmap_size={int(settings['mmap_size'])}")
+    if settings['cache_size_kib'] is not None:
+        # Negative cache_size is a size in KiB rather than a page count.
+        pragmas.append(f"PRAGMA cache_size=-{int(settings['cache_size_kib'])}")
+    if settings['busy_timeout_ms'] is not None:
+        pragmas.append(f"PRAGMA busy_timeout={int(settings['busy_timeout_ms'])}")
+    if settings['journal_mode'] == 'WAL':
+        pragmas.append('PRAGMA temp_store=MEMORY')
+    return pragmas
+
+
+def _engine_options(uri, settings):
+    options = {}
+    connect_args = {}
+    if settings['statement_cache_size'] is not None:
+        # SQLAlchemy's compiled-SQL cache and the driver's prepared statements.
+        options['query_cache_size'] = max(settings['statement_cache_size'] * 2, 500)
+        if uri.startswith('sqlite'):
+            connect_args['cached_statements'] = settings['statement_cache_size']
+    if settings['busy_timeout_ms'] is not None and uri.startswith('sqlite'):
+        connect_args['timeout'] = settings['busy_timeout_ms'] / 1000
+    # In-memory SQLite is served from a single shared connection, so pool
+    # sizing only applies to file databases.
+    in_memory = uri in ('sqlite://', 'sqlite:///:memory:') or 'mode=memory' in uri
+    if not in_memory:
+        if settings['pool_size'] is not None:
+            options['pool_size'] = settings['pool_size']
+            options['pool_pre_ping'] = True
+        if settings['max_overflow'] is not None:
+            options['max_overflow'] = settings['max_overflow']
+    if connect_args:
+        options['connect_args'] = connect_args
+    return options
+
+
+def init_storage(app):
+    """Configure the database URI and storage profile, then bind ``db`` to ``app``."""
+    app.config.setdefault('SQLALCHEMY_DATABASE_URI', os.getenv('DATABASE_URL', DEFAULT_DATABASE_URI))
+    uri = app.config['SQLALCHEMY_DATABASE_URI']
+    settings = storage_settings(app.config)
+
+    options = _engine_options(uri, settings)
+    options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+    app.config['STORAGE_SETTINGS'] = settings
+
+    db.init_app(app)
+
+    pragmas = sqlite_pragmas(settings)
+    if pragmas:
+        with app.app_context():
+            engine = db.engine
+        if engine.dialect.name == 'sqlite':
+            def apply_pragmas(dbapi_connection, connection_record):
+                cursor = dbapi_connection.cursor()
+                try:
+                    for pragma in pragmas:
+                        cursor.execute(pragma)
+                finally:
+                    cursor.close()
+
+            event.listen(engine, 'connect', apply_pragmas)
+    return settings
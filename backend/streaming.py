@@ -0,0 +1,53 @@
+"""
+NDJSON streaming for bulk consumers of the listing endpoints.
+
+Clients that send ``Accept: application/x-ndjson`` get one JSON object per
+line, produced from a server-side cursor in fixed-size batches, so memory
+use stays flat however many rows an export covers.  Streams are emitted in
+id order (or date order for events) rather than by distance.
+"""
+
+from itertools import islice
+
+from flask import Response, current_app, request, stream_with_context
+
+from geo import haversine_km
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+STREAM_BATCH_SIZE = 500
+
+
+def wants_ndjson():
+    """True when the client prefers NDJSON over a JSON array."""
+    best = request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE])
+    return best == NDJSON_MIMETYPE
+
+
+def iter_batches(query, size=STREAM_BATCH_SIZE):
+    """Yield lists of at most ``size`` rows fetched incrementally from ``query``."""
+    rows = iter(query.yield_per(size))
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def iter_with_distance(query, lat, lon, max_distance=None):
+    """Yield (row, distance) pairs, computing distances one batch at a time."""
+    for batch in iter_batches(query):
+        distances = haversine_km(lat, lon, [r.latitude for r in batch], [r.longitude for r in batch])
+        for row, distance in zip(batch, distances.tolist()):
+            if max_distance is None or distance <= max_distance:
+                yield row, distance
+
+
+def ndjson_response(items):
+    """Stream an iterable of dicts as newline-delimited JSON."""
+    dumps = current_app.json.dumps
+
+    def generate():
+        for item in items:
+            yield dumps(item) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
@@ -10,6 +10,9 @@ const api = axios.create({
   timeout: 30000, // 30 seconds timeout
 })
 
+// Endpoints answered with ETags (304 Not Modified when unchanged)
+const REVALIDATED_PATHS = [/^\/api\/stays/, /^\/api\/tourist-spots/, /^\/api\/emergency/]
+
 // Request interceptor
 api.interceptors.request.use(
   (config) => {
@@ -22,10 +25,13 @@ api.interceptors.request.use(
       }
     }
 
-    // Add timestamp to prevent caching
-    config.params = {
-      ...config.params,
-      _t: Date.now()
+    // Add timestamp to prevent caching, except on endpoints that send ETags:
+    // the browser revalidates those with If-None-Match, which needs a stable URL
+    if (!REVALIDATED_PATHS.some((pattern) => pattern.test(config.url || ''))) {
+      config.params = {
+        ...config.params,
+        _t: Date.now()
+      }
     }
     return config
   },